@@ -0,0 +1,40 @@
+"""Benchmarks of sireo hot paths, run with pytest-benchmark.
+
+    pytest benchmarks --benchmark-autosave          # save results as JSON
+    pytest benchmarks --benchmark-compare           # compare with last saved
+
+Saved results (`.benchmarks/`) are comparable across commits, e.g. with
+`pytest-benchmark compare`. Report benchmarks run over 1k and 10k trials,
+set `SIREO_BENCH_MAX_TRIALS=100000` to include 100k.
+"""
+import os
+
+import pytest
+
+import sireo
+
+MAX_TRIALS = int(os.environ.get("SIREO_BENCH_MAX_TRIALS", 10000))
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        n = getattr(item, "callspec", None) and item.callspec.params.get("n_trials")
+        if n and n > MAX_TRIALS:
+            item.add_marker(
+                pytest.mark.skip(
+                    reason=f"more than SIREO_BENCH_MAX_TRIALS={MAX_TRIALS}"
+                )
+            )
+
+
+def _started_tracker(path, **kwargs):
+    tracker = sireo.core.Tracker(path=path, meta={}, tid="bench", **kwargs)
+    tracker.bind(lambda: None)
+    tracker.start({})
+    return tracker
+
+
+@pytest.fixture
+def started_tracker():
+    """Factory of trackers of started trials."""
+    return _started_tracker
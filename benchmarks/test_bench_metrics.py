@@ -0,0 +1,37 @@
+"""Throughput of metrics."""
+import pytest
+
+from sireo import metrics
+
+ROWS = 10000
+
+
+@pytest.mark.parametrize("format", metrics.FORMATS)
+def test_meter(benchmark, started_tracker, tmp_path, format):
+    if format in metrics.BINARY_FORMATS:
+        pytest.importorskip("pyarrow")
+    tracker = started_tracker(f"{tmp_path}/trial")
+    row = {"step": 1, "loss": 0.5, "name": "x"}
+
+    def meter():
+        for _ in range(ROWS):
+            tracker.meter(row, format=format)
+        tracker.metrics.flush()
+
+    benchmark(meter)
+    benchmark.extra_info["rows"] = ROWS
+
+
+@pytest.mark.parametrize("format", metrics.FORMATS)
+def test_meter_many(benchmark, started_tracker, tmp_path, format):
+    if format in metrics.BINARY_FORMATS:
+        pytest.importorskip("pyarrow")
+    tracker = started_tracker(f"{tmp_path}/trial")
+    columns = {"step": list(range(ROWS)), "loss": [0.5] * ROWS}
+
+    def meter_many():
+        tracker.meter_many(columns, format=format)
+        tracker.metrics.flush()
+
+    benchmark(meter_many)
+    benchmark.extra_info["rows"] = ROWS
@@ -0,0 +1,54 @@
+"""Loading of reports over synthetic trees of trials."""
+import datetime
+
+import pytest
+
+from sireo import catalog, data, report
+from sireo.data import FancyDict
+
+
+@pytest.fixture(scope="module", params=[1000, 10000, 100000], ids=lambda n: f"{n}")
+def n_trials(request):
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory, n_trials):
+    root = tmp_path_factory.mktemp(f"tree{n_trials}")
+    now = datetime.datetime(2020, 1, 1)
+    for i in range(n_trials):
+        d = root / f"exp/{i // 1000}/{i}"
+        d.mkdir(parents=True)
+        doc = FancyDict(
+            tid=f"exp/{i // 1000}/{i}",
+            uid=f"{i:032x}",
+            at=FancyDict(created=now, started=now, finished=now),
+            params=FancyDict(lr=0.1 * i, layers=i % 7),
+            state="done",
+            info=FancyDict(loss=1.0 / (i + 1)),
+            result=i,
+        )
+        with open(d / "sireo.yaml", "w") as f:
+            data.dump_yaml_file(f, doc)
+    return root
+
+
+def test_report_cold(benchmark, tree, n_trials):
+    df = benchmark.pedantic(
+        lambda: report.ReportBuilder(tree).build(), rounds=1, iterations=1
+    )
+    assert len(df) == n_trials
+
+
+def test_report_incremental(benchmark, tree, n_trials):
+    builder = report.ReportBuilder(tree)
+    builder.build()
+    df = benchmark(builder.build)
+    assert len(df) == n_trials
+
+
+def test_report_catalog(benchmark, tree, n_trials):
+    c = catalog.Catalog(tree)
+    c.rebuild()
+    df = benchmark(c.load_report)
+    assert len(df) == n_trials
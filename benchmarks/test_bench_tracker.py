@@ -0,0 +1,49 @@
+"""Overhead of tracked calls, flushes and snapshots."""
+import uuid
+
+import pytest
+
+import sireo
+
+
+def noop():
+    pass
+
+
+@pytest.mark.parametrize("catalog", [False, True])
+def test_track_noop(benchmark, tmp_path, catalog):
+    sireo.init(path=str(tmp_path), catalog=catalog)
+    tracked = sireo.track(name="noop")(noop)
+    benchmark(tracked)
+
+
+@pytest.fixture(params=["local", "memory"])
+def trial_path(request, tmp_path):
+    if request.param == "local":
+        return f"{tmp_path}/trial"
+    return f"memory://bench-{uuid.uuid4().hex}/trial"
+
+
+def test_flush(benchmark, started_tracker, trial_path):
+    tracker = started_tracker(trial_path)
+    i = iter(range(10**9))
+    # changed info, so every flush writes
+    benchmark(lambda: tracker.inform(i=next(i)) or tracker.flush())
+
+
+def test_flush_unchanged(benchmark, started_tracker, trial_path):
+    tracker = started_tracker(trial_path)
+    benchmark(tracker.flush)
+
+
+@pytest.mark.parametrize("compression", [None, "default"])
+@pytest.mark.parametrize("state_size", [10**3, 10**6])
+def test_snapshot(benchmark, started_tracker, tmp_path, compression, state_size):
+    options = {} if compression == "default" else {"compression": compression}
+    tracker = started_tracker(f"{tmp_path}/trial", snapshot_options=options)
+    # resumable state of the trial, e.g. an iterator over a dataset
+    tracker.iter = iter(list(range(state_size)))
+    benchmark(tracker.dump_snapshot)
+    benchmark.extra_info["snapshot_bytes"] = (
+        (tmp_path / "trial/snapshot.pickle").stat().st_size
+    )
@@ -9,35 +9,61 @@ import contextlib
 import contextvars
 import datetime
 import functools
+import importlib.util
 import inspect
+import itertools
 import logging
 import typing
 from os import PathLike
-from typing import Callable, Dict, Optional, Union
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Optional, Union
 
-from . import core, hook, meta
+from . import catalog, core, hook, meta, profiling, report
 from . import runner as _vtvt_runner
 
-try:
-    # extends python's pickle module for serializing and de-serializing
-    import dill
-except ImportError:
-    dill = None
+# modules used as `sireo.<module>` by other modules and users
+from . import data, metrics, overhead, resources  # noqa: F401
+
+# registers `runner="queue"`
+from . import workqueue  # noqa: F401
+
+# `dill` extends python's pickle module for serializing and de-serializing,
+# it's optional and imported on first access of `sireo.dill`
+_has_dill = importlib.util.find_spec("dill") is not None
 
 logger = logging.getLogger(__name__)
 _T = typing.TypeVar("_T")
 
 
 _var_tracker = contextvars.ContextVar("sireo._var_tracker")
+_global_tracker = None
 _global_runner = None
 
 __all__ = [
     "track",
     "init",
     "run",
+    "arun",
+    "load_report",
+    "current_tracker",
+    "inform",
+    "meter",
+    "meter_many",
+    "snapshot",
+    "sweep",
 ]
 
 
+def __getattr__(name):
+    global dill
+    if name == "dill":
+        if _has_dill:
+            import dill
+        else:
+            dill = None
+        return dill
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 @contextlib.contextmanager
 def using_tracker(tracker: core.ATracker, globally: bool = False):
     global _global_tracker
@@ -75,6 +101,9 @@ def init(
 
     global _global_runner
 
+    if _global_runner is not None:
+        _global_runner.close()
+
     if isinstance(runner, type):
         runner_cls = runner
     else:
@@ -99,53 +128,208 @@ def run(tid: str, fn: Callable[..., _T], /, **params: Dict) -> core.Trial:
     return _global_runner.run(tid, fn, **params)
 
 
+async def arun(tid: str, fn: Callable[..., _T], /, **params: Dict) -> core.Trial:
+    if _global_runner is None:
+        raise RuntimeError("Runner is not initialized, call `sireo.init(...) first`")
+    return await _global_runner.arun(tid, fn, **params)
+
+
+def load_report(
+    path: str | PathLike | None = None,
+    rebuild: bool = False,
+    source: str = "catalog",
+):
+    """DataFrame with a row per trial stored under `path`.
+
+    Reads the trial catalog of the results root (the initialized runner's
+    path by default) when it's kept up to date by the initialized runner
+    (`sireo.init(catalog=True)`), it's rebuilt from the tree when missing
+    or when `rebuild` is set. Otherwise the report is built from the tree
+    like with `source="tree"`, which reads `sireo.yaml` files and reparses
+    only trials changed since last call.
+    """
+    if path is None:
+        if _global_runner is None:
+            raise RuntimeError(
+                "Runner is not initialized, call `sireo.init(...) first` or pass path"
+            )
+        path = _global_runner.path
+    if source == "tree":
+        return report.load_report(path)
+    elif source != "catalog":
+        raise ValueError(f"unknown report source {source!r}")
+    maintained = getattr(_global_runner, "catalog", None)
+    c = None
+    if rebuild or maintained is not None and catalog._is_local(path):
+        c = catalog.Catalog(path)
+    if not rebuild and (c is None or maintained.filename != c.filename):
+        # catalog may be stale or maintained by another process, it's left
+        # alone and rows are ordered like in the catalog
+        df = report.load_report(path, meta=False)
+        if len(df):
+            df = df.sort_values(["created", "tid"], ignore_index=True)
+        return df
+    if rebuild or not c.exists():
+        c.rebuild()
+    return c.load_report()
+
+
+def current_tracker() -> core.ATracker:
+    tracker = _var_tracker.get(None) or _global_tracker
+    if tracker is None:
+        raise RuntimeError("No active tracker, function should be run via sireo")
+    return tracker
+
+
+def inform(**kwargs) -> None:
+    current_tracker().inform(**kwargs)
+
+
+def meter(
+    metrics: Optional[Dict] = None,  # noqa: F811
+    /,
+    series: Optional[str] = None,
+    format: Optional[str] = None,
+    **kwargs,
+) -> None:
+    current_tracker().meter({**(metrics or {}), **kwargs}, series, format)
+
+
+def meter_many(
+    metrics,  # noqa: F811
+    /,
+    series: Optional[str] = None,
+    format: Optional[str] = None,
+) -> None:
+    """Log a batch of metric rows given as dict of equal-length arrays or
+    a DataFrame. Optional `at` column holds timestamps of rows."""
+    current_tracker().meter_many(metrics, series, format)
+
+
+def snapshot() -> None:
+    current_tracker().snapshot()
+
+
+def attach(name: str, mode: str = "w", **kwargs):
+    return current_tracker().attach(name, mode, **kwargs)
+
+
 def _default_tid(**kwargs):
     return datetime.datetime.now().strftime("%y-%m-%d/%H:%M:%S")
 
 
+def _tid_factory(
+    f: Callable,
+    name: Optional[str] = None,
+    tid_pattern: Union[str, Callable, None] = None,
+    rand_slug: bool = True,
+) -> Callable[[Dict], str]:
+    f = core._dewrap_sireo_fn(f)
+    if name is None:
+        name_prefix = f"{f.__module__}.{f.__qualname__}/"
+    elif name:
+        name_prefix = name + "/"
+    else:
+        name_prefix = ""
+
+    if tid_pattern is None:
+        tidp = _default_tid
+    elif isinstance(tid_pattern, str):
+        tidp = tid_pattern.format
+    elif isinstance(tid_pattern, Callable):
+        tidp = tid_pattern
+    else:
+        raise ValueError(
+            f"invalid tid pattern {tid_pattern}, expected string or callable"
+        )
+
+    if rand_slug:
+        import uuid
+
+        suffixc = lambda: "/" + uuid.uuid1().hex
+    else:
+        suffixc = lambda: ""
+
+    return lambda params: name_prefix + tidp(**params) + suffixc()
+
+
+def _expand_grid(grid) -> Iterator[Dict]:
+    if not isinstance(grid, Mapping):
+        yield from grid
+        return
+
+    def _values(v):
+        if isinstance(v, (str, bytes, Mapping)) or not isinstance(v, Iterable):
+            return [v]
+        return v
+
+    keys = list(grid)
+    for vs in itertools.product(*(_values(grid[k]) for k in keys)):
+        yield dict(zip(keys, vs))
+
+
+def sweep(
+    fn: Callable[..., _T],
+    grid: Union[Mapping[str, Iterable], Iterable[Dict]],
+    /,
+    name: Optional[str] = None,
+    tid_pattern: Union[str, Callable, None] = None,
+    rand_slug: bool = True,
+    max_concurrency: Optional[int] = None,
+) -> Iterator[core.Trial]:
+    """Run `fn` for every params of the `grid`, yield trials as they finish.
+
+    `grid` is either a mapping of param name to list of values (all
+    combinations are tried) or an iterable of params dicts. Trials are
+    submitted lazily, at most `max_concurrency` trials are in flight.
+    Metadata is captured once for the whole sweep.
+    """
+    if _global_runner is None:
+        raise RuntimeError("Runner is not initialized, call `sireo.init(...) first`")
+    mk_tid = _tid_factory(fn, name, tid_pattern, rand_slug)
+    return _global_runner.sweep(
+        fn,
+        ((mk_tid(p), p) for p in _expand_grid(grid)),
+        max_concurrency=max_concurrency,
+    )
+
+
 def track(
     name: Optional[str] = None,
     tid_pattern: Union[str, Callable, None] = None,
     rand_slug: bool = True,
+    profile: Union[str, "profiling.Profiler", bool, None] = None,
 ):
     def wrapper(f: _T) -> _T:
-        if name is None:
-            name_prefix = f"{f.__module__}.{f.__qualname__}/"
-        elif name:
-            name_prefix = name + "/"
-        else:
-            name_prefix = ""
-
-        if tid_pattern is None:
-            tidp = _default_tid
-        elif isinstance(tid_pattern, str):
-            tidp = tid_pattern.format
-        elif isinstance(tid_pattern, Callable):
-            tidp = tid_pattern
-        else:
-            raise ValueError(
-                f"invalid tid pattern {tid_pattern}, expected string or callable"
-            )
-
-        if rand_slug:
-            import uuid
-
-            suffixc = lambda: "/" + uuid.uuid1().hex
-        else:
-            suffixc = lambda: ""
+        mk_tid = _tid_factory(f, name, tid_pattern, rand_slug)
         argspec = inspect.getfullargspec(f)
         sig = inspect.signature(f)
 
-        @functools.wraps(f)
-        def g(*args, **kwargs):
+        def bind_params(args, kwargs):
             params = dict(sig.bind(*args, **kwargs).arguments)
             if argspec.varkw:
                 params.update(params.pop(argspec.varkw, {}))
+            return mk_tid(params), params
+
+        if inspect.iscoroutinefunction(f) or inspect.isasyncgenfunction(f):
+
+            @functools.wraps(f)
+            async def g(*args, **kwargs):
+                tid, params = bind_params(args, kwargs)
+                with profiling.requested(profile):
+                    trial = await arun(tid, captured_f, **params)
+                return trial.result
+
+        else:
 
-            tid = name_prefix + tidp(**params) + suffixc()
-            return run(tid, captured_f, **params).result
+            @functools.wraps(f)
+            def g(*args, **kwargs):
+                tid, params = bind_params(args, kwargs)
+                with profiling.requested(profile):
+                    trial = run(tid, captured_f, **params)
+                return trial.result
 
-        if dill:
+        if _has_dill:
             # `dill` is able to serialize mutated global function,
             # but fails to serialize recursive closure (when `g` captures itself)
             captured_f = f
@@ -0,0 +1,177 @@
+"""SQLite catalog of trials stored under the results root."""
+from __future__ import annotations
+
+import contextlib
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import typing
+import urllib.parse
+
+import sireo
+from sireo import hook
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = ".sireo-catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    uid TEXT PRIMARY KEY,
+    tid TEXT,
+    path TEXT,
+    state TEXT,
+    created TEXT,
+    finished TEXT,
+    record TEXT
+);
+CREATE INDEX IF NOT EXISTS trials_tid ON trials (tid);
+"""
+
+
+def _json_default(x):
+    if isinstance(x, (datetime.date, datetime.time)):
+        return x.isoformat()
+    return repr(x)
+
+
+def _flatten(d: typing.Mapping, prefix: str, out: typing.Dict) -> typing.Dict:
+    for k, v in d.items():
+        if isinstance(v, typing.Mapping) and v:
+            _flatten(v, f"{prefix}{k}.", out)
+        elif prefix or not isinstance(v, typing.Mapping):
+            out[f"{prefix}{k}"] = v
+    return out
+
+
+def trial_row(data: typing.Mapping, path: str, meta=False) -> typing.Dict:
+    """Nested record of the trial, `params`, `info` (and `meta`) are dicts."""
+    at = data.get("at") or {}
+    row = {
+        "tid": data.get("tid"),
+        "uid": data.get("uid"),
+        "path": path,
+        "state": data.get("state"),
+        "created": at.get("created"),
+        "started": at.get("started"),
+        "finished": at.get("finished"),
+        "params": data.get("params") or {},
+        "info": data.get("info") or {},
+    }
+    if meta:
+        row["meta"] = data.get("meta") or {}
+    if "result" in data:
+        row["result"] = data["result"]
+    if "error" in data:
+        row["error"] = data["error"]
+    return row
+
+
+def flatten_row(row: typing.Mapping) -> typing.Dict:
+    return _flatten(row, "", {})
+
+
+def trial_record(data: typing.Mapping, path: str) -> typing.Dict:
+    """Flat record of the trial used for reports."""
+    return flatten_row(trial_row(data, path))
+
+
+def _is_local(path) -> bool:
+    return urllib.parse.urlparse(str(path)).scheme in ("", "file")
+
+
+class Catalog:
+    """Index of trials which makes reports independent of the tree size.
+
+    Trackers update the catalog on start and finish (see `CatalogHook`),
+    `rebuild` rescans `sireo.yaml` files of the whole tree. The catalog is
+    a SQLite database, so the results root has to be a local filesystem.
+    """
+
+    def __init__(self, root, filename=CATALOG_FILE):
+        if not _is_local(root):
+            raise ValueError(f"catalog requires local filesystem, got {root!r}")
+        self.root = str(root)
+        local_root = urllib.parse.urlparse(self.root).path or self.root
+        self.filename = os.path.join(local_root, filename)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.filename)
+
+    @contextlib.contextmanager
+    def connect(self):
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.filename, timeout=60)
+        try:
+            with conn:
+                conn.executescript(_SCHEMA)
+                yield conn
+        finally:
+            conn.close()
+
+    def _rows(self, records):
+        for r in records:
+            yield (
+                r["uid"],
+                r["tid"],
+                r["path"],
+                r["state"],
+                _json_default(r["created"]) if r["created"] else None,
+                _json_default(r["finished"]) if r["finished"] else None,
+                json.dumps(r, default=_json_default),
+            )
+
+    def put(self, records: typing.Iterable[typing.Dict], clear=False) -> None:
+        with self.connect() as conn:
+            if clear:
+                conn.execute("DELETE FROM trials")
+            conn.executemany(
+                "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._rows(records),
+            )
+
+    def update(self, tracker: sireo.core.Tracker) -> None:
+        path = os.path.relpath(tracker.path, self.root)
+        self.put([trial_record(tracker.data, path)])
+
+    def rebuild(self) -> None:
+        """Recreate catalog by rescanning the results tree."""
+        logger.info("rebuild catalog %s", self.filename)
+        rows = sireo.report.ReportBuilder(self.root, meta=False).rows()
+        self.put((flatten_row(r) for r in rows), clear=True)
+
+    def load_report(self) -> pd.DataFrame:
+        import pandas as pd
+
+        with self.connect() as conn:
+            rows = conn.execute("SELECT record FROM trials ORDER BY created, tid")
+            records = [json.loads(r) for r, in rows]
+        df = pd.DataFrame.from_records(records)
+        for c in ("created", "started", "finished"):
+            if c in df:
+                df[c] = pd.to_datetime(df[c])
+        return df
+
+
+class CatalogHook(hook.Hook):
+    def __init__(self, catalog: Catalog):
+        self.catalog = catalog
+
+    def _update(self, tracker: sireo.core.Tracker):
+        # catalog is only an index of the tree, it must not fail the trial,
+        # `sireo.load_report(rebuild=True)` brings it up to date
+        try:
+            self.catalog.update(tracker)
+        except Exception:
+            logger.exception("failed to update catalog with trial %s", tracker.tid)
+
+    def on_tracker_start(self, tracker: sireo.core.Tracker):
+        self._update(tracker)
+
+    def on_tracker_finish(self, tracker: sireo.core.Tracker):
+        self._update(tracker)
@@ -1,18 +1,26 @@
+import asyncio
+import contextlib
 import datetime
+import hashlib
+import inspect
 import logging
 import os
 import pickle
+import time
 import traceback
 import typing
 import uuid
 from functools import cached_property
-from typing import Dict, Iterator, List
+from typing import AsyncIterator, Dict, Iterator, List
 
 import fsspec
-import pandas as pd
 
 import sireo
-from sireo.data import AutoCommitableFileWrapper, FancyDict, dump_yaml_file, path_fs
+from sireo import overhead
+from sireo.data import FancyDict, dump_yaml_file, open_atomic, path_fs
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +29,12 @@ def _dewrap_sireo_fn(fn):
     return getattr(fn, "_sireo__wrapped_fn", fn)
 
 
+def _is_partial(name: str) -> bool:
+    """Temporary file of an atomic write which is still in progress."""
+    base = os.path.basename(name)
+    return base.startswith(".") and base.endswith(".tmp")
+
+
 class TrialFailedException(Exception):
     def __init__(self, error, traceback_txt):
         Exception.__init__(self, error)
@@ -44,9 +58,10 @@ class Trial:
         self._fs = _fs or path_fs(path)
 
     def reload(self):
-        p = self.path
+        p, fs = self.path, self._fs
         self.__dict__.clear()
         self.path = p
+        self._fs = fs
 
     def attach(self, name, mode="rb", **kwargs):
         p = f"{self.path}/{name}"
@@ -54,13 +69,21 @@ class Trial:
 
     @cached_property
     def attached(self) -> List[str]:
-        gs = self._fs.glob(f"{self.path}/**")
+        gs = self._fs.find(self.path)
         gss = [os.path.relpath(x, self.path) for x in gs]
-        gss.remove("sireo.yaml")
-        return gss
+        own = {"sireo.yaml", *(f"sireo.{f}" for f in sireo.data.RECORD_FORMATS)}
+        return [x for x in gss if x not in own and not _is_partial(x)]
 
     @cached_property
     def data(self):
+        for fmt in sireo.data.RECORD_FORMATS:
+            try:
+                with self.attach(f"sireo.{fmt}") as f:
+                    return sireo.data.load_record_file(f, fmt)
+            except FileNotFoundError:
+                continue
+            except ImportError:
+                logger.debug("skip sireo.%s record", fmt)
         with self.attach("sireo.yaml") as f:
             return sireo.data.load_yaml_file(f)
 
@@ -86,7 +109,7 @@ class Trial:
 
     @property
     def status(self):
-        return self.status
+        return self.data.state
 
     @property
     def result(self):
@@ -100,8 +123,8 @@ class Trial:
             raise TrialFailedException(self.data.error, trackeback_txt)
         return self.data.get("result")
 
-    def load_metrics(self) -> pd.DataFrame:
-        return sireo.metrics.load_metrics(self)
+    def load_metrics(self, **kwargs) -> "pd.DataFrame":
+        return sireo.metrics.load_metrics(self, **kwargs)
 
     def __repr__(self):
         return f"<Trial {self.uid!r}>"
@@ -113,8 +136,44 @@ class Trial:
         return hash(self.uid)
 
 
-class ATracker(typing.Protocol):
+class FutureTrial(Trial):
+    """Trial which is still running (or queued) by an asynchronous runner.
+
+    Behaves like a `concurrent.futures.Future`, every access to the
+    trial data blocks until the trial is finished.
+    """
+
+    def __init__(self, path, future, _fs=None):
+        Trial.__init__(self, path, _fs=_fs)
+        self.future = future
+
+    def reload(self):
+        future = self.future
+        Trial.reload(self)
+        self.future = future
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def wait(self, timeout=None) -> "FutureTrial":
+        self.future.result(timeout)
+        return self
+
+    def add_done_callback(self, fn):
+        self.future.add_done_callback(lambda _: fn(self))
+
+    @cached_property
+    def data(self):
+        self.wait()
+        return Trial.data.func(self)
+
+    def __repr__(self):
+        if not self.done():
+            return f"<Trial {self.path!r} (pending)>"
+        return Trial.__repr__(self)
+
 
+class ATracker(typing.Protocol):
     uid: str | None
 
     tid: str | None
@@ -130,6 +189,11 @@ class ATracker(typing.Protocol):
     ) -> None:
         ...
 
+    def meter_many(
+        self, metrics, series: str | None = None, format: str | None = None
+    ) -> None:
+        ...
+
     def flush(self) -> None:
         ...
 
@@ -144,34 +208,102 @@ class _BaseTracker(ATracker):
         self.tid = tid
         self.metrics = metrics
         self.hook = sireo.hook.coerce_to_hook(hook)
+        if overhead.enabled() and not isinstance(self.hook, sireo.hook.TimedHook):
+            # hooks given by the tracker to its infused trackers are timed already
+            self.hook = sireo.hook.TimedHook(self.hook)
+        self._fs = path_fs(path)
+
+    def __getstate__(self):
+        # filesystem is resolved again in the process which loads the tracker
+        state = dict(self.__dict__)
+        state.pop("_fs", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._fs = path_fs(self.path)
 
     def attach(self, name, mode="w", autocommit="onclose", **kwargs):
         fn = f"{self.path}/{name}"
         logger.debug("open attachement %s (resolved to %s)", name, fn)
         if "w" in mode and autocommit == "onclose":
-            # f = path_fs(fn).open(fn, mode=mode, autocommit=False, **kwargs)
-            f = path_fs(fn).open(fn, mode=mode, autocommit=True, **kwargs)
-            logger.debug("wrap file object for an autocommit")
-            return AutoCommitableFileWrapper(f)
+            logger.debug("open attachement %s for an atomic write", name)
+            return open_atomic(self._fs, fn, mode=mode, **kwargs)
         else:
-            return path_fs(fn).open(fn, mode=mode, autocommit=autocommit, **kwargs)
+            return self._fs.open(fn, mode=mode, autocommit=autocommit, **kwargs)
 
     def meter(self, metrics, series=None, format=None):
         self.metrics.meter(metrics, series or "", format)
 
+    def meter_many(self, metrics, series=None, format=None):
+        self.metrics.meter_many(metrics, series or "", format)
+
     def activate(self):
         pass
 
 
+# tracker state which is not stored in snapshots, it's either flushed
+# to `sireo.yaml` before the snapshot is taken or belongs to the process
+_SNAPSHOT_EXCLUDED = (
+    "path",
+    "hook",
+    "func",
+    "data",
+    "meta",
+    "info",
+    "profiler",
+    "_flushed_digest",
+    "_snapshot_at",
+)
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickles tracker state, references to the tracker itself are persistent."""
+
+    def __init__(self, file, tracker):
+        pickle.Pickler.__init__(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.tracker = tracker
+
+    def persistent_id(self, obj):
+        return "tracker" if obj is self.tracker else None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, tracker):
+        pickle.Unpickler.__init__(self, file)
+        self.tracker = tracker
+
+    def persistent_load(self, pid):
+        if pid != "tracker":
+            raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+        return self.tracker
+
+
 class Tracker(_BaseTracker):
-    def __init__(self, path, meta, tid, hook=None):
+    def __init__(
+        self,
+        path,
+        meta,
+        tid,
+        hook=None,
+        key=None,
+        metrics_options=None,
+        record_format=None,
+        snapshot_options=None,
+        profiler=None,
+    ):
+        self.metrics_options = metrics_options or {}
+        self.record_format = record_format
+        # `min_interval` in seconds between snapshots and their `compression`
+        self.snapshot_options = snapshot_options or {}
+        self.profiler = profiler
         _BaseTracker.__init__(
             self,
             path=path,
             tid=tid,
             uid=uuid.uuid1().hex,
             hook=hook,
-            metrics=sireo.metrics.MetricsExporter(self),
+            metrics=sireo.metrics.MetricsExporter(self, **self.metrics_options),
         )
         self._binded = False
         self.func = None
@@ -180,9 +312,13 @@ class Tracker(_BaseTracker):
         self.info = {}
         self.data = FancyDict()
         self.meta = meta
+        self.key = key
+        # digest of the last written `sireo.yaml`, unchanged data isn't rewritten
+        self._flushed_digest = None
 
         # support snapshottable fns
         self.iter = None
+        self._snapshot_at = None
 
     def inform(self, **kwargs):
         for k in self.info.keys() & kwargs.keys():
@@ -197,19 +333,38 @@ class Tracker(_BaseTracker):
             raise RuntimeError(
                 "function `snapshot` can be used only from tracked iterator"
             )
+        now = time.monotonic()
+        min_interval = self.snapshot_options.get("min_interval", 0)
+        if self._snapshot_at is not None and now - self._snapshot_at < min_interval:
+            logger.debug(
+                "skip snapshot, last one is %.1fs old", now - self._snapshot_at
+            )
+            return
         self.dump_snapshot()
+        self._snapshot_at = now
 
+    @overhead.timed("tracker.snapshot", overhead.method_tracker)
     def dump_snapshot(self):
         self.flush()
         logger.debug("dump snapshot")
+        state = self.__getstate__()
+        # flushed to `sireo.yaml` and metric chunks already
+        for k in _SNAPSHOT_EXCLUDED:
+            state.pop(k, None)
+        compression = self.snapshot_options.get(
+            "compression", sireo.data.default_compression()
+        )
         with self.attach("snapshot.pickle", "wb") as f:
-            pickle.dump(self, f)
+            with sireo.data.compressed_writer(f, compression) as w:
+                _SnapshotPickler(w, self).dump(state)
 
     def load_snapshot(self):
         try:
             logger.debug("loading snapshot for")
             with self.attach("snapshot.pickle", "rb") as f:
-                other = pickle.load(f)
+                other = _SnapshotUnpickler(
+                    sireo.data.decompressed_reader(f), self
+                ).load()
         except FileNotFoundError:
             logger.debug("snapshot not found")
             return False
@@ -218,18 +373,24 @@ class Tracker(_BaseTracker):
             return False
         logger.debug("resume from snapshot")
 
-        if self.params != other.params:
+        if isinstance(other, Tracker):
+            # whole tracker, written by older versions
+            other = dict(other.__dict__)
+
+        if self.params != other.get("params"):
             raise RuntimeError(
-                "snapshot has mismatched params", self.params, other.params
+                "snapshot has mismatched params", self.params, other.get("params")
             )
         # if self.func != other.func:
         #    raise RuntimeError("snapshot has mismatched function", self.func, other.func)
 
-        other = dict(other.__dict__)
-        other.pop("path", None)
-        other.pop("hook", None)
+        for k in _SNAPSHOT_EXCLUDED:
+            other.pop(k, None)
         self.__dict__.update(other)
 
+        self.data = Trial(self.path, _fs=self._fs).data
+        self.meta = self.data.get("meta")
+        self.info = self.data.info
         return True
 
     def start(self, params: Dict):
@@ -249,6 +410,8 @@ class Tracker(_BaseTracker):
                 "info": self.info,
             }
         )
+        if self.key:
+            self.data.key = self.key
         self.hook.on_tracker_start(self)
         self.flush(metrics=False)
 
@@ -257,7 +420,25 @@ class Tracker(_BaseTracker):
             r = _dewrap_sireo_fn(self.func)(**self.params)
         else:
             r = self.iter  # resumed
+        return self._consume(r)
+
+    async def _arunfunc(self):
+        if self.iter is None:
+            r = _dewrap_sireo_fn(self.func)(**self.params)
+            if inspect.isawaitable(r):
+                r = await r
+        else:
+            r = self.iter  # resumed
+
+        if isinstance(r, AsyncIterator):
+            # async generators can't be pickled, so there is no `snapshot` here
+            async for x in r:
+                if x is not None:
+                    return x
+            return None
+        return self._consume(r)
 
+    def _consume(self, r):
         if isinstance(r, Iterator):
             self.iter = r
             for x in self.iter:
@@ -273,8 +454,7 @@ class Tracker(_BaseTracker):
         self.func = fn
         self.params = params
 
-    def run(self, fn=None, /, **params):
-
+    def _begin(self, fn, params):
         if fn is not None:
             self.bind(fn, **params)
         else:
@@ -290,8 +470,29 @@ class Tracker(_BaseTracker):
 
         self.flush(metrics=False)
 
+    def _profiled(self):
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.profile(self)
+
+    def run(self, fn=None, /, **params):
+        self._begin(fn, params)
+        try:
+            with self._profiled():
+                result = self._runfunc()
+        except BaseException as e:
+            self.finish(None, exc=e)
+        else:
+            self.finish(result)
+
+    async def arun(self, fn=None, /, **params):
+        self._begin(fn, params)
         try:
-            result = self._runfunc()
+            with self._profiled():
+                result = await self._arunfunc()
+        except asyncio.CancelledError as e:
+            self.finish(None, exc=e)
+            raise
         except BaseException as e:
             self.finish(None, exc=e)
         else:
@@ -317,27 +518,44 @@ class Tracker(_BaseTracker):
             self._finish_done(result)
         self.data.at.finished = datetime.datetime.now()
         self.hook.on_tracker_finish(self)
+        if overhead.enabled():
+            self.info["sireo_overhead"] = overhead.trial_stats(self)
         self.flush()
+        self.metrics.close()
 
     def infused_tracker(self) -> "InfusedTracker":
         return InfusedTracker(
             path=self.path,
             tid=self.tid,
             hook=self.hook,
+            metrics_options=self.metrics_options,
         )
 
+    @overhead.timed("tracker.flush", overhead.method_tracker)
     def flush(self, metrics=True):
         logger.debug("flush tracking contxt %s", self)
         self.data.info = self.info
         self.hook.on_tracker_flush(self)
-        with self.attach("sireo.yaml", mode="wt") as f:
-            sireo.data.dump_yaml_file(f, self.data)
+        text = sireo.data.dump_yaml_str(self.data)
+        digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        if digest != self._flushed_digest:
+            self._write_data(text)
+            self._flushed_digest = digest
+        else:
+            logger.debug("tracker data is not changed since last flush")
         if metrics:
             self.metrics.flush()
 
+    def _write_data(self, text):
+        with self.attach("sireo.yaml", mode="wt") as f:
+            f.write(text)
+        if self.record_format:
+            with self.attach(f"sireo.{self.record_format}", mode="wb") as f:
+                sireo.data.dump_record_file(f, self.data, self.record_format)
+
 
 class InfusedTracker(_BaseTracker):
-    def __init__(self, path, tid, hook):
+    def __init__(self, path, tid, hook, metrics_options=None):
         uid = uuid.uuid1().hex
         _BaseTracker.__init__(
             self,
@@ -345,7 +563,9 @@ class InfusedTracker(_BaseTracker):
             uid=uid,
             tid=tid,
             hook=hook,
-            metrics=sireo.metrics.MetricsExporter(self, add_uuid=uid),
+            metrics=sireo.metrics.MetricsExporter(
+                self, add_uuid=uid, **(metrics_options or {})
+            ),
         )
         self.info = FancyDict()
         self.info_path = f"sireo-{uid}.yaml"
@@ -1,38 +1,140 @@
+import contextlib
+import datetime
+import gzip
 import io
+import json
 import logging
+import os
+import re
 import urllib
+import uuid
 from functools import wraps
-from typing import Any, Dict, NamedTuple
+from typing import Any, Dict, NamedTuple, Optional
 
 import fsspec
 import wrapt
 import yaml
 import yaml.constructor
 
+try:
+    # optional, faster and more compact trial records
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    # optional, fast compression of snapshots
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
 logger = logging.getLogger(__name__)
 
 
+def dump_yaml_str(data) -> str:
+    if CYAMLDumper is YAMLDumper:
+        return yaml.dump(data, Dumper=YAMLDumper)
+    else:
+        return _TOPLEVEL_KEY_RE.sub("\n\n", yaml.dump(data, Dumper=CYAMLDumper))
+
+
 def dump_yaml_file(file: io.IOBase, data):
-    yaml.dump(data, file, Dumper=YAMLDumper)
+    file.write(dump_yaml_str(data))
 
 
 class AutoCommitableFileWrapper(wrapt.ObjectProxy):
-    def __exit__(self, *args, **kwargs):
-        return super().__exit__(*args, **kwargs)
+    """File which is committed by `commit` callback once it's closed.
 
-    def close(self):
-        f = self.__wrapped__
-        if isinstance(f, io.TextIOWrapper):
-            f = f.buffer
+    When the `with` block fails, the file is discarded instead, so
+    readers never observe partially written files.
+    """
+
+    def __init__(self, wrapped, commit=None, discard=None):
+        super().__init__(wrapped)
+        self._self_commit = commit
+        self._self_discard = discard
+        self._self_done = False
+
+    def __enter__(self):
+        return self
 
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def close(self):
+        if self._self_done:
+            return
+        self._self_done = True
         self.__wrapped__.close()
-        if not f.autocommit:
-            logger.debug("commit file %s", f)
-            f.commit()
+        if self._self_commit is not None:
+            logger.debug("commit file %s", self.__wrapped__)
+            self._self_commit()
+
+    def discard(self):
+        if self._self_done:
+            return
+        self._self_done = True
+        logger.debug("discard file %s", self.__wrapped__)
+        try:
+            self.__wrapped__.close()
+        finally:
+            if self._self_discard is not None:
+                self._self_discard()
 
     def __del__(self):
-        logger.info("close garbage-collected %s", self)
-        self.close()
+        if not self._self_done:
+            logger.info("close garbage-collected %s", self)
+            self.close()
+
+
+# backends where rename is atomic and cheap
+_RENAME_PROTOCOLS = {"file", "local", "memory"}
+
+
+def _renames_atomically(fs: fsspec.AbstractFileSystem) -> bool:
+    protocols = (fs.protocol,) if isinstance(fs.protocol, str) else fs.protocol
+    return not _RENAME_PROTOCOLS.isdisjoint(protocols)
+
+
+def open_atomic(fs: fsspec.AbstractFileSystem, path: str, mode="wb", **kwargs):
+    """Open file for writing, its content appears at `path` only on close.
+
+    Local files are written to a temporary file in the same directory and
+    renamed, other filesystems use fsspec transactions (`autocommit=False`)
+    when supported, so failed uploads are never published.
+    """
+    if _renames_atomically(fs):
+        d, sep, name = path.rpartition("/")
+        tmp = f"{d}{sep}.{name}.{uuid.uuid4().hex[:8]}.tmp"
+
+        def _discard():
+            if fs.exists(tmp):
+                fs.rm_file(tmp)
+
+        return AutoCommitableFileWrapper(
+            fs.open(tmp, mode=mode, **kwargs),
+            commit=lambda: fs.mv(tmp, path),
+            discard=_discard,
+        )
+
+    try:
+        f = fs.open(path, mode=mode, autocommit=False, **kwargs)
+    except NotImplementedError:
+        return AutoCommitableFileWrapper(fs.open(path, mode=mode, **kwargs))
+    raw = f.buffer if isinstance(f, io.TextIOWrapper) else f
+    if getattr(raw, "autocommit", True):
+        return AutoCommitableFileWrapper(f)
+    return AutoCommitableFileWrapper(
+        f, commit=raw.commit, discard=getattr(raw, "discard", None)
+    )
 
 
 class FancyDict(dict):
@@ -58,46 +160,201 @@ class BadPythonYAML(NamedTuple):
     value: Any
 
 
-class YAMLDumper(yaml.Dumper):
+class _YAMLDumperMixin:
     def __init__(self, *args, **kwargs):
         kwargs["indent"] = 4
         kwargs["sort_keys"] = False
-        return yaml.Dumper.__init__(self, *args, **kwargs)
+        return super().__init__(*args, **kwargs)
+
+    def represent_bad_python_ref(self, data):
+        return self.represent_scalar(data.tag, data.value)
 
+
+class YAMLDumper(_YAMLDumperMixin, yaml.Dumper):
     def write_line_break(self, data=None):
         super().write_line_break(data)
         if len(self.indents) == 1:
             super().write_line_break()
 
-    def represent_bad_python_ref(self, data):
-        return self.represent_scalar(data.tag, data.value)
+
+def _catch_bad_python_yaml(f):
+    @wraps(f)
+    def method(self, suffix, node):
+        try:
+            return f(self, suffix, node)
+        except yaml.constructor.ConstructorError:
+            return BadPythonYAML(node.tag, node.value)
+
+    return method
 
 
-class YAMLLoader(yaml.FullLoader):
+class _YAMLLoaderMixin:
     def construct_yaml_map(self, node):
         data = FancyDict()
         yield data
         value = self.construct_mapping(node)
         data.update(value)
 
-    def _catch_bad_python_yaml(f):
-        @wraps(f)
-        def method(self, suffix, node):
-            try:
-                return f(self, suffix, node)
-            except yaml.constructor.ConstructorError:
-                return BadPythonYAML(node.tag, node.value)
+    construct_python_name = _catch_bad_python_yaml(
+        yaml.constructor.FullConstructor.construct_python_name
+    )
+    construct_python_module = _catch_bad_python_yaml(
+        yaml.constructor.FullConstructor.construct_python_module
+    )
+    construct_python_object = _catch_bad_python_yaml(
+        yaml.constructor.FullConstructor.construct_python_object
+    )
+
+
+class YAMLLoader(_YAMLLoaderMixin, yaml.FullLoader):
+    pass
+
+
+if yaml.__with_libyaml__:
+    # libyaml emitter has no `write_line_break` hook,
+    # empty lines between top-level keys are added by `dump_yaml_file`
+
+    class CYAMLDumper(_YAMLDumperMixin, yaml.CDumper):
+        pass
+
+    class CYAMLLoader(_YAMLLoaderMixin, yaml.CFullLoader):
+        pass
+
+
+else:
+    CYAMLDumper = YAMLDumper
+    CYAMLLoader = YAMLLoader
+
+_TOPLEVEL_KEY_RE = re.compile(r"\n(?!- |-$)(?=\S)", re.MULTILINE)
+
 
-        return method
+def _register_yaml(dumper, loader):
+    dumper.add_representer(FancyDict, dumper.represent_dict)
+    dumper.add_representer(BadPythonYAML, dumper.represent_bad_python_ref)
 
+    loader.add_constructor("tag:yaml.org,2002:map", loader.construct_yaml_map)
+    loader.add_multi_constructor(
+        "tag:yaml.org,2002:python/name:", loader.construct_python_name
+    )
+    loader.add_multi_constructor(
+        "tag:yaml.org,2002:python/module:", loader.construct_python_module
+    )
+    loader.add_multi_constructor(
+        "tag:yaml.org,2002:python/object:", loader.construct_python_object
+    )
 
-def path_fs(path: str) -> fsspec.AbstractFileSystem:
-    scheme = urllib.parse.urlparse(path).scheme or "file"
-    return fsspec.filesystem(scheme, auto_mkdir=True)
+
+_register_yaml(YAMLDumper, YAMLLoader)
+if CYAMLDumper is not YAMLDumper:
+    _register_yaml(CYAMLDumper, CYAMLLoader)
+
+
+# filesystems resolved by `path_fs`, per process
+_fs_cache: Dict[tuple, fsspec.AbstractFileSystem] = {}
+
+
+def _clear_fs_cache():
+    # instances of remote backends hold sessions and event loops, which
+    # can't be shared with forked children
+    _fs_cache.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_fs_cache)
+
+
+def path_scheme(path: str) -> str:
+    if ":" not in path:
+        return "file"
+    return urllib.parse.urlparse(path).scheme or "file"
+
+
+def path_fs(path: str, **storage_options) -> fsspec.AbstractFileSystem:
+    scheme = path_scheme(path)
+    key = (
+        (scheme, fsspec.utils.tokenize(storage_options))
+        if storage_options
+        else (scheme,)
+    )
+    try:
+        return _fs_cache[key]
+    except KeyError:
+        pass
+    fs = fsspec.filesystem(scheme, auto_mkdir=True, **storage_options)
+    return _fs_cache.setdefault(key, fs)
 
 
 def load_yaml_file(file: io.IOBase) -> Any:
-    return yaml.load(file, Loader=YAMLLoader)
+    return yaml.load(file, Loader=CYAMLLoader)
+
+
+# binary trial record formats, in order of preference when reading
+RECORD_FORMATS = ("msgpack", "json")
+
+
+def _encode_record(x):
+    if type(x) in (str, int, float, bool) or x is None:
+        return x
+    elif isinstance(x, dict):
+        if all(type(k) is str for k in x):
+            return {k: _encode_record(v) for k, v in x.items()}
+    elif isinstance(x, list):
+        return [_encode_record(v) for v in x]
+    elif type(x) is tuple:
+        return {"__tuple__": [_encode_record(v) for v in x]}
+    elif type(x) is datetime.datetime:
+        return {"__datetime__": x.isoformat()}
+    elif type(x) is datetime.date:
+        return {"__date__": x.isoformat()}
+    # anything else is kept as YAML, so records load same as `sireo.yaml`
+    return {"__yaml__": yaml.dump(x, Dumper=CYAMLDumper)}
+
+
+def _decode_record(d):
+    if len(d) == 1:
+        k, v = next(iter(d.items()))
+        if k == "__tuple__":
+            return tuple(v)
+        elif k == "__datetime__":
+            return datetime.datetime.fromisoformat(v)
+        elif k == "__date__":
+            return datetime.date.fromisoformat(v)
+        elif k == "__yaml__":
+            return yaml.load(v, Loader=CYAMLLoader)
+    return FancyDict(d)
+
+
+def _require_record_format(format):
+    if format not in RECORD_FORMATS:
+        raise ValueError(f"unknown record format {format!r}")
+    if format == "msgpack" and msgpack is None:
+        raise ImportError("record format 'msgpack' requires `msgpack`")
+
+
+def dump_record_file(file: io.IOBase, data, format: str):
+    """Write trial data as binary `format` record, file is opened in binary mode."""
+    _require_record_format(format)
+    d = _encode_record(data)
+    if format == "msgpack":
+        file.write(msgpack.packb(d))
+    else:
+        file.write(json.dumps(d).encode())
+
+
+def load_record_file(file: io.IOBase, format: str) -> Any:
+    _require_record_format(format)
+    if format == "msgpack":
+        return msgpack.unpackb(file.read(), object_hook=_decode_record)
+    else:
+        return json.loads(file.read(), object_hook=_decode_record)
+
+
+def load_trial_file(file: io.IOBase, name: str) -> Any:
+    """Load `sireo.yaml` or one of trial records by file name."""
+    ext = name.rsplit(".", 1)[-1]
+    if ext in RECORD_FORMATS:
+        return load_record_file(file, ext)
+    return load_yaml_file(file)
 
 
 def merge_dicts_rec(a: Any, b: Any) -> Dict:
@@ -113,3 +370,65 @@ def merge_dicts_rec(a: Any, b: Any) -> Dict:
         return FancyDict(b)
     else:
         return b
+
+
+# compressions of snapshots and magic bytes of their frames
+COMPRESSIONS = {
+    "zstd": b"\x28\xb5\x2f\xfd",
+    "lz4": b"\x04\x22\x4d\x18",
+    "gzip": b"\x1f\x8b",
+}
+
+
+def default_compression() -> str:
+    if zstandard is not None:
+        return "zstd"
+    if lz4_frame is not None:
+        return "lz4"
+    return "gzip"
+
+
+def _require_compression(compression):
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"unknown compression {compression!r}")
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("compression 'zstd' requires `zstandard`")
+    if compression == "lz4" and lz4_frame is None:
+        raise ImportError("compression 'lz4' requires `lz4`")
+
+
+@contextlib.contextmanager
+def compressed_writer(file: io.IOBase, compression: Optional[str]):
+    """Binary stream compressing into `file`, `file` is left open."""
+    if compression is None:
+        yield file
+        return
+    _require_compression(compression)
+    if compression == "zstd":
+        w = zstandard.ZstdCompressor().stream_writer(file, closefd=False)
+    elif compression == "lz4":
+        w = lz4_frame.LZ4FrameFile(file, mode="wb")
+    else:
+        w = gzip.GzipFile(fileobj=file, mode="wb", compresslevel=6)
+    with w:
+        yield w
+
+
+def decompressed_reader(file: io.IOBase) -> io.IOBase:
+    """Binary stream of `file` content, compression is detected by magic bytes."""
+    magic = file.read(4)
+    file.seek(0)
+    for compression, m in COMPRESSIONS.items():
+        if magic.startswith(m):
+            break
+    else:
+        return file
+    _require_compression(compression)
+    if compression == "zstd":
+        # buffered, `pickle` needs `readline`
+        return io.BufferedReader(
+            zstandard.ZstdDecompressor().stream_reader(file, closefd=False)
+        )
+    elif compression == "lz4":
+        return lz4_frame.LZ4FrameFile(file, mode="rb")
+    return gzip.GzipFile(fileobj=file, mode="rb")
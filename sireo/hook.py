@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+import atexit
+import copy
+import dataclasses
+import logging
+import multiprocessing.util
+import os
+import queue
+import threading
+import time
+import typing
+import weakref
 from typing import Iterable
 
 import sireo.core
 
+logger = logging.getLogger(__name__)
+
 
 class Hook:
     def on_tracker_start(self, tracker: sireo.core.Tracker):
@@ -35,6 +48,196 @@ class HooksCollection(Hook):
             locals()[method_name] = _mk_run(method_name)
 
 
+class TimedHook(Hook):
+    """Accounts time spent in the wrapped hook to `sireo.overhead`."""
+
+    def __init__(self, hook):
+        self.hook = hook
+
+    def _mk_run(method_name):
+        name = "hook." + method_name[len("on_tracker_") :]
+
+        def _run(self, tracker):
+            start = time.perf_counter()
+            try:
+                getattr(self.hook, method_name)(tracker)
+            finally:
+                sireo.overhead.add(tracker, name, time.perf_counter() - start)
+
+        return _run
+
+    for method_name in dir(Hook):
+        if not method_name.startswith("_"):
+            locals()[method_name] = _mk_run(method_name)
+
+
+@dataclasses.dataclass(frozen=True)
+class TrackerSnapshot:
+    """State of the tracker at the moment of the event, given to async hooks."""
+
+    path: str
+    uid: str
+    tid: str
+    key: str | None
+    data: sireo.data.FancyDict | None
+    info: dict
+
+    @classmethod
+    def of(cls, tracker) -> TrackerSnapshot:
+        return cls(
+            path=tracker.path,
+            uid=tracker.uid,
+            tid=tracker.tid,
+            key=getattr(tracker, "key", None),
+            data=copy.deepcopy(getattr(tracker, "data", None)),
+            info=copy.deepcopy(tracker.info),
+        )
+
+    @property
+    def trial(self) -> sireo.core.Trial:
+        return sireo.core.Trial(self.path)
+
+
+class AsyncHook(Hook):
+    """Dispatches events to the wrapped hook in a background thread.
+
+    Events carry `TrackerSnapshot` instead of the tracker, so the hook must
+    not modify the tracker (e.g. `inform`). At most `queue_size` events are
+    pending, when the queue is full the tracker either waits
+    (`policy="block"`) or the event is dropped (`policy="drop"`), finish
+    events are never dropped. Pending events are delivered at exit.
+    """
+
+    def __init__(self, hook: Hook, queue_size: int = 1000, policy: str = "block"):
+        if policy not in ("block", "drop"):
+            raise ValueError(f"unknown policy {policy!r}, expected 'block' or 'drop'")
+        self.hook = hook
+        self.queue_size = queue_size
+        self.policy = policy
+        self._init_worker()
+
+    def _init_worker(self):
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+        self.dropped = 0
+        # event -> [count, seconds, max seconds, max lag]
+        self._latency: typing.Dict[str, list] = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for k in ("_lock", "_queue", "_worker", "dropped", "_latency"):
+            del state[k]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_worker()
+
+    def _submit(self, method_name, tracker, block):
+        with self._lock:
+            if self._worker is None:
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._worker = threading.Thread(
+                    target=self._work,
+                    args=(self._queue,),
+                    name="sireo-hook",
+                    daemon=True,
+                )
+                self._worker.start()
+                _register_async_hook(self)
+            q = self._queue
+        item = (method_name, TrackerSnapshot.of(tracker), time.perf_counter())
+        if block or self.policy == "block":
+            q.put(item)
+            return
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logger.debug("hook queue is full, drop %s of %s", method_name, tracker.tid)
+
+    def _work(self, q: queue.Queue):
+        while True:
+            item = q.get()
+            try:
+                if item is None:
+                    return
+                method_name, snapshot, submitted = item
+                start = time.perf_counter()
+                try:
+                    getattr(self.hook, method_name)(snapshot)
+                except Exception:
+                    logger.exception("hook %s failed on %s", method_name, snapshot.tid)
+                end = time.perf_counter()
+                with self._lock:
+                    lat = self._latency.setdefault(method_name, [0, 0.0, 0.0, 0.0])
+                    lat[0] += 1
+                    lat[1] += end - start
+                    lat[2] = max(lat[2], end - start)
+                    lat[3] = max(lat[3], start - submitted)
+            finally:
+                q.task_done()
+
+    def latency(self) -> typing.Dict[str, typing.Dict]:
+        """Time spent in the wrapped hook and max wait in the queue, by event."""
+        with self._lock:
+            return {
+                k: {"count": c, "seconds": s, "max_seconds": m, "max_lag": lag}
+                for k, (c, s, m, lag) in self._latency.items()
+            }
+
+    def flush(self):
+        """Wait until all pending events are delivered."""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self):
+        with self._lock:
+            worker, q = self._worker, self._queue
+            self._worker = self._queue = None
+        if worker is not None:
+            q.put(None)
+            worker.join()
+            _async_hooks.discard(self)
+
+    def on_tracker_start(self, tracker: sireo.core.Tracker):
+        self._submit("on_tracker_start", tracker, block=False)
+
+    def on_tracker_flush(self, tracker: sireo.core.Tracker):
+        self._submit("on_tracker_flush", tracker, block=False)
+
+    def on_tracker_finish(self, tracker: sireo.core.Tracker):
+        self._submit("on_tracker_finish", tracker, block=True)
+
+    def on_tracker_infused(self, tracker: sireo.core.InfusedTracker):
+        self._submit("on_tracker_infused", tracker, block=False)
+
+
+_async_hooks: typing.MutableSet[AsyncHook] = weakref.WeakSet()
+_drain_registered_pid = None
+
+
+def _register_async_hook(h: AsyncHook):
+    global _drain_registered_pid
+    _async_hooks.add(h)
+    if _drain_registered_pid != os.getpid():
+        # workers of process pools end with `os._exit` which skips `atexit`,
+        # finalizers of multiprocessing still run there
+        _drain_registered_pid = os.getpid()
+        multiprocessing.util.Finalize(None, _drain_async_hooks, exitpriority=10)
+
+
+@atexit.register
+def _drain_async_hooks():
+    for h in list(_async_hooks):
+        try:
+            h.close()
+        except Exception:
+            logger.exception("failed to drain events of %s", h.hook)
+
+
 def coerce_to_hook(hook: Hook | Iterable[Hook] | None) -> Hook:
     if hook is None:
         return Hook()
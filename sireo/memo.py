@@ -0,0 +1,128 @@
+"""Memoization of finished trials by function and params."""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import inspect
+import json
+import logging
+import marshal
+import pickle
+import typing
+
+import sireo
+from sireo.data import path_fs
+
+logger = logging.getLogger(__name__)
+
+
+class _NotCanonical(Exception):
+    pass
+
+
+def _digest(x) -> str:
+    """Hash of value's content, `repr` is truncated (numpy) or has addresses."""
+    tobytes = getattr(x, "tobytes", None)
+    dtype = getattr(x, "dtype", None)
+    if tobytes is not None and dtype is not None and not dtype.hasobject:
+        # numpy arrays and scalars, pickles of arrays depend on memory layout
+        data = [dtype.str, list(getattr(x, "shape", ())), tobytes(order="C")]
+    else:
+        data = x
+    try:
+        b = pickle.dumps(data, protocol=4)
+    except Exception as e:
+        raise _NotCanonical(f"{type(x).__name__}: {e}") from None
+    return hashlib.sha256(b).hexdigest()
+
+
+def _canonical(x):
+    if isinstance(x, dict):
+        return {"__dict__": sorted([str(k), _canonical(v)] for k, v in x.items())}
+    elif isinstance(x, (list, tuple)):
+        return [_canonical(v) for v in x]
+    elif isinstance(x, (set, frozenset)):
+        return {"__set__": sorted((_canonical(v) for v in x), key=repr)}
+    elif x is None or isinstance(x, (bool, int, float, str)):
+        return x
+    elif isinstance(x, (datetime.date, datetime.time)):
+        return x.isoformat()
+    else:
+        return {"__digest__": [type(x).__qualname__, _digest(x)]}
+
+
+def _fn_fingerprint(fn) -> str:
+    fn = sireo.core._dewrap_sireo_fn(fn)
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        code = getattr(fn, "__code__", None)
+        if code is None:
+            return repr(fn)
+        return marshal.dumps(code).hex()
+
+
+def trial_key(fn, params: typing.Dict) -> str | None:
+    """Hash of function's name, its source (or bytecode) and params.
+
+    Params starting with `_` are not tracked, so they don't affect the key.
+    Values of other than plain types are hashed by their pickle, `None` is
+    returned when some of them can't be pickled.
+    """
+    fn = sireo.core._dewrap_sireo_fn(fn)
+    name = f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', fn)}"
+    params = {k: v for k, v in params.items() if not k.startswith("_")}
+    try:
+        canonical = _canonical(params)
+    except _NotCanonical as e:
+        logger.info("trial of %s is not memoized, param %s", name, e)
+        return None
+    h = hashlib.sha256()
+    h.update(name.encode())
+    h.update(b"\0")
+    h.update(_fn_fingerprint(fn).encode())
+    h.update(b"\0")
+    h.update(json.dumps(canonical, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+class TrialIndex:
+    """On-disk mapping from trial key to tid of a finished trial."""
+
+    def __init__(self, path, dirname=".sireo-index"):
+        self.path = str(path)
+        self.root = f"{self.path}/{dirname}"
+        self._fs = path_fs(self.root)
+
+    def _key_path(self, key):
+        return f"{self.root}/{key[:2]}/{key}"
+
+    def get(self, key: str) -> sireo.core.Trial | None:
+        try:
+            with self._fs.open(self._key_path(key), "rt") as f:
+                tid = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+        trial = sireo.core.Trial(f"{self.path}/{tid}", _fs=self._fs)
+        try:
+            if trial.data.get("key") != key or trial.data.get("state") != "done":
+                return None
+        except FileNotFoundError:
+            logger.warning("indexed trial %s is missing", trial.path)
+            return None
+        return trial
+
+    def put(self, key: str, tid: str) -> None:
+        with self._fs.open(self._key_path(key), "wt") as f:
+            f.write(tid)
+
+
+class MemoHook(sireo.hook.Hook):
+    def __init__(self, index: TrialIndex):
+        self.index = index
+
+    def on_tracker_finish(self, tracker: sireo.core.Tracker):
+        if tracker.key and tracker.data.state == "done":
+            logger.debug("memoize trial %s as %s", tracker.tid, tracker.key)
+            self.index.put(tracker.key, tracker.tid)
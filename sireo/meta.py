@@ -1,4 +1,9 @@
+import concurrent.futures
 import logging
+import os
+import queue
+import threading
+import time
 import typing
 
 logger = logging.getLogger(__name__)
@@ -6,20 +11,145 @@ from .data import FancyDict, merge_dicts_rec
 
 providers: typing.Dict[str, typing.Callable[[], str]] = {}
 
+# seconds to wait for a provider, unless it declares its own timeout
+DEFAULT_TIMEOUT = 10.0
+
 
 class NoMetadataException(Exception):
     pass
 
 
-def capture_meta(ps=None) -> FancyDict:
+def provider(fn=None, /, *, stable=False, timeout=None):
+    """Declare properties of a metadata provider.
+
+    Values of `stable` providers don't change during the life of the process
+    (host name, installed packages), they are captured once and reused.
+    """
+
+    def deco(fn):
+        fn.sireo_stable = stable
+        fn.sireo_timeout = timeout
+        return fn
+
+    return deco if fn is None else deco(fn)
+
+
+# providers run at most this many at a time
+MAX_WORKERS = 8
+
+
+class _Pool:
+    """Bounded pool of daemon threads, providers which hang don't block the exit."""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._threads = 0
+        self._idle = 0
+
+    def submit(self, fn) -> concurrent.futures.Future:
+        f = concurrent.futures.Future()
+        with self._lock:
+            self._queue.put((f, fn))
+            if self._idle:
+                self._idle -= 1
+            elif self._threads < self.max_workers:
+                self._threads += 1
+                threading.Thread(
+                    target=self._work, name="sireo-meta", daemon=True
+                ).start()
+        return f
+
+    def _work(self):
+        while True:
+            with self._lock:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    # next submit claims this thread
+                    self._idle += 1
+                    item = None
+            f, fn = item or self._queue.get()
+            if f.set_running_or_notify_cancel():
+                try:
+                    f.set_result(fn())
+                except BaseException as e:
+                    f.set_exception(e)
+
+
+_lock = threading.RLock()
+_pool = None
+# futures of `stable` providers, by provider
+_stable: typing.Dict[typing.Callable, concurrent.futures.Future] = {}
+# futures of other providers which are still running
+_running: typing.Dict[typing.Callable, concurrent.futures.Future] = {}
+
+
+def _reset_after_fork():
+    global _pool
+    _pool = None
+    _stable.clear()
+    _running.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _start(provider) -> concurrent.futures.Future:
+    global _pool
+    if _pool is None:
+        _pool = _Pool(MAX_WORKERS)
+    return _pool.submit(provider)
+
+
+def _submit(provider) -> concurrent.futures.Future:
+    stable = getattr(provider, "sireo_stable", False)
+    with _lock:
+        f = (_stable if stable else _running).get(provider)
+        if f is not None:
+            # provider which hangs keeps occupying a single thread
+            return f
+        f = _start(provider)
+        if stable:
+            _stable[provider] = f
+            f.add_done_callback(_forget(_stable, provider, failed_only=True))
+        else:
+            _running[provider] = f
+            f.add_done_callback(_forget(_running, provider))
+        return f
+
+
+def _forget(futures, provider, failed_only=False):
+    def callback(f):
+        if failed_only and f.exception() is None:
+            return
+        with _lock:
+            if futures.get(provider) is f:
+                del futures[provider]
+
+    return callback
+
+
+def capture_meta(ps=None, timeout=DEFAULT_TIMEOUT) -> FancyDict:
+    """Run providers concurrently, slow ones are skipped after their timeout."""
     if ps is None:
         ps = providers
-    metas = {}
-    for key, provider in ps.items():
-
+    start = time.monotonic()
+    futures = {}
+    for key, p in ps.items():
         logger.info("capture metadata %r", key)
+        futures[key] = (p, _submit(p))
+
+    metas = {}
+    for key, (p, f) in futures.items():
+        t = getattr(p, "sireo_timeout", None) or timeout
         try:
-            m = provider()
+            m = f.result(timeout=max(0, start + t - time.monotonic()))
+        except concurrent.futures.TimeoutError:
+            logger.warning("capture of %r timed out after %.1fs", key, t)
+            continue
         except NoMetadataException:
             continue
         except Exception as e:
@@ -1,53 +1,358 @@
 from __future__ import annotations
 
+import atexit
+import contextlib
 import datetime
 import json
 import logging
+import queue
+import re
+import sys
+import threading
+import typing
+import weakref
+from array import array
 from collections import defaultdict
 from pathlib import Path
-from typing import Union
-
-import pandas as pd
+from typing import Iterator, Union
 
 import sireo
+from sireo import overhead
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# optional, required for `parquet` and `arrow` formats, imported on first use
+pyarrow = None
 
 logger = logging.getLogger(__name__)
 
+FORMATS = ("csv", "jsonl", "parquet", "arrow")
+BINARY_FORMATS = ("parquet", "arrow")
+
+
+def _require_pyarrow(format):
+    global pyarrow
+    if pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError(f"metrics format {format!r} requires `pyarrow`") from None
+
+
+def _is_dataframe(x) -> bool:
+    # pandas isn't imported only to find out that `x` is not a frame
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(x, pd.DataFrame)
+
+
+class _Missing:
+    def __repr__(self):
+        return "<missing>"
+
+    def __reduce__(self):
+        return "_MISSING"
+
+
+_MISSING = _Missing()
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _new_column(value):
+    if isinstance(value, bool):
+        return []
+    elif isinstance(value, int):
+        return array("q")
+    elif isinstance(value, float):
+        return array("d")
+    else:
+        return []
+
+
+class ColumnBuffer:
+    """Buffered metrics of a single series, stored column by column.
+
+    Column type is inferred from its first value: ints and floats are
+    kept in compact `array.array`, everything else in lists. Columns are
+    promoted (int -> float -> object) when a value doesn't fit. Columns
+    missing from some rows are stored as lists padded by `_MISSING`.
+    """
+
+    def __init__(self):
+        self.columns = {"at": array("d")}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.columns = {"at": array("d")}
+        self.size = 0
+
+    def _promote(self, key, value):
+        col = self.columns[key]
+        if isinstance(col, array) and col.typecode == "q" and type(value) is float:
+            col = array("d", col)
+        else:
+            col = list(col)
+        self.columns[key] = col
+        return col
+
+    def append(self, row, at):
+        cols = self.columns
+        if "at" in row:
+            row = {k: v for k, v in row.items() if k != "at"}
+        cols["at"].append(at)
+
+        for k, v in row.items():
+            col = cols.get(k)
+            if col is None:
+                if self.size:
+                    col = cols[k] = [_MISSING] * self.size
+                else:
+                    col = cols[k] = _new_column(v)
+            elif type(v) is bool and isinstance(col, array):
+                # bools fit int and float arrays, but would be written as numbers
+                col = self._promote(k, v)
+            try:
+                col.append(v)
+            except (TypeError, OverflowError):
+                self._promote(k, v).append(v)
+
+        self.size += 1
+        if len(row) + 1 < len(cols):
+            for k, col in cols.items():
+                if len(col) < self.size:
+                    if isinstance(col, array):
+                        col = cols[k] = list(col)
+                    col.append(_MISSING)
+
+    def _extend_column(self, key, values: np.ndarray):
+        import numpy as np
+
+        col = self.columns.get(key)
+        kind = values.dtype.kind
+        if kind == "u" and len(values) and values.max() > _INT64_MAX:
+            # would wrap around in int64 column, kept as objects like in `append`
+            kind = "O"
+        if col is None:
+            if self.size:
+                col = self.columns[key] = [_MISSING] * self.size
+            elif kind in "iu":
+                col = self.columns[key] = array("q")
+            elif kind == "f":
+                col = self.columns[key] = array("d")
+            else:
+                col = self.columns[key] = []
+
+        if isinstance(col, array) and col.typecode == "q" and kind == "f":
+            col = self.columns[key] = array("d", col)
+        if isinstance(col, array) and kind in ("iuf" if col.typecode == "d" else "iu"):
+            col.frombytes(np.ascontiguousarray(values, dtype=col.typecode).tobytes())
+        else:
+            if isinstance(col, array):
+                col = self.columns[key] = list(col)
+            col.extend(values.tolist())
+
+    def extend(self, columns, at):
+        """Append a batch of rows given as equal-length arrays per column."""
+        import numpy as np
+
+        n = len(at)
+        columns = {k: v for k, v in columns.items() if k != "at"}
+        for k, col in list(self.columns.items()):
+            if k != "at" and k not in columns:
+                if isinstance(col, array):
+                    col = self.columns[k] = list(col)
+                col.extend([_MISSING] * n)
+        for k, v in columns.items():
+            self._extend_column(k, v)
+        self.columns["at"].frombytes(np.ascontiguousarray(at, dtype="d").tobytes())
+        self.size += n
+
+    def to_dataframe(self) -> pd.DataFrame:
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for k, col in self.columns.items():
+            if isinstance(col, array):
+                data[k] = np.frombuffer(col, dtype=col.typecode)
+            else:
+                data[k] = pd.Series(
+                    [None if v is _MISSING else v for v in col], dtype=object
+                )
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self) -> "pyarrow.Table":
+        import numpy as np
+
+        _require_pyarrow("arrow")
+        data = {}
+        for k, col in self.columns.items():
+            if isinstance(col, array):
+                data[k] = np.frombuffer(col, dtype=col.typecode)
+            else:
+                vs = [None if v is _MISSING else v for v in col]
+                try:
+                    data[k] = pyarrow.array(vs)
+                except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+                    data[k] = pyarrow.array([None if v is None else str(v) for v in vs])
+        return pyarrow.table(data)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of buffered values."""
+        return sum(
+            col.itemsize * len(col) if isinstance(col, array) else 8 * len(col)
+            for col in self.columns.values()
+        )
+
+    def rows(self):
+        keys = list(self.columns)
+        for vs in zip(*self.columns.values()):
+            yield {k: v for k, v in zip(keys, vs) if v is not _MISSING}
+
+
+def _exporter_tracker(exporter, *args):
+    return exporter.tracker
+
 
 class MetricsExporter:
+    """Buffers metrics of the tracker and writes them as file chunks.
+
+    A series is flushed when it reaches `metrics_per_file` rows,
+    `max_bytes` of buffered data or its oldest row is older than
+    `max_age` seconds, whichever comes first. With `background=True`
+    chunks are written by a writer thread through a queue of at most
+    `queue_size` chunks (metering blocks when it is full), the thread also
+    flushes series reaching `max_age` while the trial is idle.
+    """
+
     def __init__(
         self,
         tracker: sireo.core.Tracker,
         metrics_per_file=10000,
         filename="metrics",
         add_uuid=None,
+        compression="zstd",
+        max_bytes=None,
+        max_age=None,
+        background=False,
+        queue_size=4,
     ):
         self.tracker = tracker
-        self.metricss = defaultdict(list)
+        self.metricss = defaultdict(ColumnBuffer)
         self.metrics_per_file = metrics_per_file
         self.metrics_cnt = 0
         self.filename = filename
         self.formats = {}
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.background = background
+        self.queue_size = queue_size
         self._rslug = f"-{add_uuid}" if add_uuid else ""
+        self._init_writer()
 
-    def meter(self, kvs, series, format):
+    def _init_writer(self):
+        self._lock = threading.Lock() if self.background else contextlib.nullcontext()
+        self._queue = None
+        self._writer = None
+        self._error = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for k in ("_lock", "_queue", "_writer", "_error"):
+            del state[k]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_writer()
+
+    def _set_format(self, series, format):
         format = format or "csv"
-        assert format in {"jsonl", "csv"}
+        assert format in FORMATS
         assert self.formats.setdefault(series, format) == format
+        if format in BINARY_FORMATS:
+            _require_pyarrow(format)
 
-        series = series or ""
-        metrics = self.metricss[series]
+    def _is_full(self, metrics: ColumnBuffer, now):
         if len(metrics) >= self.metrics_per_file:
-            self.flush()
-        d = dict(kvs)
-        d["at"] = datetime.datetime.now().timestamp()
-        metrics.append(d)
+            return True
+        if self.max_bytes is not None and metrics.nbytes >= self.max_bytes:
+            return True
+        if self.max_age is not None and len(metrics):
+            return now - metrics.columns["at"][0] >= self.max_age
+        return False
 
-    def flush_series(self, series):
-        format = self.formats[series]
+    @overhead.timed("metrics.meter", _exporter_tracker)
+    def meter(self, kvs, series, format):
+        self._set_format(series, format)
+
+        series = series or ""
+        now = datetime.datetime.now().timestamp()
+        if self.background and self._writer is None:
+            # writer also flushes series of idle trials
+            self._start_writer()
+        chunks = ()
+        with self._lock:
+            if self._is_full(self.metricss[series], now):
+                chunks = self._take_all()
+            self.metricss[series].append(kvs, now)
+        self._write_chunks(chunks)
+
+    @overhead.timed("metrics.meter_many", _exporter_tracker)
+    def meter_many(self, data, series, format):
+        self._set_format(series, format)
+
+        import numpy as np
+
+        series = series or ""
+        if _is_dataframe(data):
+            columns = {k: data[k].to_numpy() for k in data.columns}
+        else:
+            columns = {k: np.asarray(v) for k, v in data.items()}
+        sizes = {len(v) for v in columns.values()}
+        if len(sizes) > 1:
+            raise ValueError(f"metrics have different lengths: {sorted(sizes)}")
+        n = sizes.pop() if sizes else 0
+
+        now = datetime.datetime.now().timestamp()
+        if self.background and self._writer is None:
+            self._start_writer()
+        at = columns.pop("at", None)
+        if at is None:
+            at = np.full(n, now)
+        elif at.dtype.kind == "M":
+            at = _local_epoch(at)
+
+        start = 0
+        while start < n:
+            chunks = ()
+            with self._lock:
+                metrics = self.metricss[series]
+                room = self.metrics_per_file - len(metrics)
+                if room <= 0 or self._is_full(metrics, now):
+                    chunks = self._take_all()
+                else:
+                    end = min(n, start + room)
+                    metrics.extend(
+                        {k: v[start:end] for k, v in columns.items()}, at[start:end]
+                    )
+                    start = end
+            self._write_chunks(chunks)
+
+    def _take_series(self, series):
+        """Detach buffered metrics of the series, returns chunk to write."""
         metrics = self.metricss[series]
         if not metrics:
-            return
+            return None
+        format = self.formats[series]
 
         if series:
             mfile = (
@@ -56,27 +361,310 @@ class MetricsExporter:
         else:
             mfile = f"{self.filename}{self._rslug}-{self.metrics_cnt:04}.{format}"
 
+        self.metricss[series] = ColumnBuffer()
+        self.metrics_cnt += 1
+        return mfile, format, metrics
+
+    def _take_all(self):
+        chunks = (self._take_series(s) for s in list(self.metricss))
+        return [c for c in chunks if c is not None]
+
+    def _write_chunks(self, chunks):
+        for c in chunks:
+            if self.background:
+                self._submit(c)
+            else:
+                self._write_chunk(*c)
+
+    @overhead.timed("metrics.write", _exporter_tracker)
+    def _write_chunk(self, mfile, format, metrics: ColumnBuffer):
         logger.debug("write metrics to %s", mfile)
         wf = {
             "csv": self._write_metrics_file_csv,
             "jsonl": self._write_metrics_file_jsonl,
+            "parquet": self._write_metrics_file_parquet,
+            "arrow": self._write_metrics_file_arrow,
         }[format]
-        with self.tracker.attach(mfile, mode="wt") as f:
+        mode = "wb" if format in BINARY_FORMATS else "wt"
+        with self.tracker.attach(mfile, mode=mode) as f:
             wf(f, metrics)
 
-        metrics.clear()
-        self.metrics_cnt += 1
+    def _start_writer(self):
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            args=(self._queue,),
+            name=f"sireo-metrics-{self.tracker.uid}",
+            daemon=True,
+        )
+        self._writer.start()
+        _background_exporters.add(self)
+
+    def _submit(self, chunk):
+        if self._writer is None:
+            self._start_writer()
+        # blocks when writer can't keep up
+        self._queue.put(chunk)
+
+    def _write_loop(self, q: queue.Queue):
+        timeout = self.max_age / 2 if self.max_age else None
+        while True:
+            try:
+                chunk = q.get(timeout=timeout)
+            except queue.Empty:
+                now = datetime.datetime.now().timestamp()
+                with self._lock:
+                    chunks = [
+                        self._take_series(s)
+                        for s, m in list(self.metricss.items())
+                        if len(m) and self._is_full(m, now)
+                    ]
+                for c in chunks:
+                    self._write_chunk_safe(c)
+                continue
+
+            try:
+                if chunk is None:
+                    return
+                self._write_chunk_safe(chunk)
+            finally:
+                q.task_done()
 
-    def _write_metrics_file_jsonl(self, f, metrics):
-        for m in metrics:
+    def _write_chunk_safe(self, chunk):
+        try:
+            self._write_chunk(*chunk)
+        except Exception as e:
+            logger.exception("failed to write metrics %s", chunk[0])
+            self._error = e
+
+    def _write_metrics_file_jsonl(self, f, metrics: ColumnBuffer):
+        for m in metrics.rows():
             json.dump(m, f, sort_keys=True)
             f.write("\n")
 
-    def _write_metrics_file_csv(self, f, metrics):
-        df = pd.DataFrame(metrics)
+    def _write_metrics_file_csv(self, f, metrics: ColumnBuffer):
+        df = metrics.to_dataframe()
         df.set_index("at", inplace=True)
         df.to_csv(f)
 
+    def _write_metrics_file_parquet(self, f, metrics: ColumnBuffer):
+        _require_pyarrow("parquet")
+        pyarrow.parquet.write_table(
+            metrics.to_arrow(), f, compression=self.compression or "none"
+        )
+
+    def _write_metrics_file_arrow(self, f, metrics: ColumnBuffer):
+        _require_pyarrow("arrow")
+        table = metrics.to_arrow()
+        options = pyarrow.ipc.IpcWriteOptions(compression=self.compression)
+        with pyarrow.ipc.new_file(f, table.schema, options=options) as w:
+            w.write_table(table)
+
+    @overhead.timed("metrics.flush_series", _exporter_tracker)
+    def flush_series(self, series):
+        with self._lock:
+            chunk = self._take_series(series)
+        if chunk is not None:
+            self._write_chunks([chunk])
+
+    @overhead.timed("metrics.flush", _exporter_tracker)
     def flush(self):
-        for s in self.metricss:
-            self.flush_series(s)
+        with self._lock:
+            chunks = self._take_all()
+        self._write_chunks(chunks)
+
+        if self._queue is not None:
+            self._queue.join()
+        if self._error is not None:
+            e, self._error = self._error, None
+            raise e
+
+    def close(self):
+        """Flush metrics and stop the writer thread."""
+        try:
+            self.flush()
+        finally:
+            if self._writer is not None:
+                self._queue.put(None)
+                self._writer.join()
+                self._writer = None
+                self._queue = None
+                _background_exporters.discard(self)
+
+
+_background_exporters: typing.MutableSet[MetricsExporter] = weakref.WeakSet()
+
+
+@atexit.register
+def _drain_background_exporters():
+    for e in list(_background_exporters):
+        try:
+            e.close()
+        except Exception:
+            logger.exception("failed to flush metrics of %s", e.tracker)
+
+
+def read_metrics_file(f, format, columns=None) -> pd.DataFrame:
+    """Read single metrics chunk, optionally only the given `columns`.
+
+    Columns missing from the chunk (metered only in other chunks) are
+    filled with NaN.
+    """
+    import pandas as pd
+
+    if format == "csv":
+        wanted = None if columns is None else set(columns)
+        df = pd.read_csv(f, usecols=None if wanted is None else wanted.__contains__)
+    elif format == "jsonl":
+        df = pd.read_json(f, lines=True, dtype=False)
+    elif format == "parquet":
+        _require_pyarrow(format)
+        pf = pyarrow.parquet.ParquetFile(f)
+        if columns is not None:
+            names = set(pf.schema_arrow.names)
+            df = pf.read(columns=[c for c in columns if c in names]).to_pandas()
+        else:
+            df = pf.read().to_pandas()
+    elif format == "arrow":
+        _require_pyarrow(format)
+        table = pyarrow.ipc.open_file(f).read_all()
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        df = table.to_pandas()
+    else:
+        raise ValueError(f"unknown metrics format {format!r}")
+    return df if columns is None else df.reindex(columns=columns)
+
+
+_CHUNK_RE = re.compile(
+    r"^(?P<name>[^-]+)(?:-(?P<uid>[0-9a-f]{32}))?-(?P<cnt>\d{4,})"
+    r"(?:-(?P<series>.+))?\.(?P<format>csv|jsonl|parquet|arrow)$"
+)
+
+
+class MetricsChunk(typing.NamedTuple):
+    path: str
+    uid: str
+    cnt: int
+    series: str
+    format: str
+
+
+def find_metrics_chunks(trial: sireo.core.Trial, filename="metrics"):
+    """List metrics chunks of the trial ordered by writer and chunk number.
+
+    Chunks of the trial's own tracker come first, followed by chunks of
+    infused trackers (`metrics-<uid>-NNNN...`).
+    """
+    chunks = []
+    for p in trial._fs.ls(trial.path, detail=False):
+        m = _CHUNK_RE.match(p.rstrip("/").rsplit("/", 1)[-1])
+        if m is None or m["name"] != filename:
+            continue
+        chunks.append(
+            MetricsChunk(
+                path=p,
+                uid=m["uid"] or "",
+                cnt=int(m["cnt"]),
+                series=m["series"] or "",
+                format=m["format"],
+            )
+        )
+    chunks.sort(key=lambda c: (c.uid, c.cnt))
+    return chunks
+
+
+def _local_epoch(values) -> np.ndarray:
+    """Seconds since epoch, naive datetimes are local like in `datetime.timestamp`."""
+    import dateutil.tz
+    import numpy as np
+    import pandas as pd
+
+    idx = pd.DatetimeIndex(values)
+    if idx.tz is None:
+        # `at` is stored as `datetime.now().timestamp()`, ambiguous times
+        # are the first occurrence (`fold=0`)
+        idx = idx.tz_localize(
+            dateutil.tz.tzlocal(),
+            ambiguous=np.ones(len(idx), dtype=bool),
+            nonexistent="shift_forward",
+        )
+    utc = idx.tz_convert("UTC").tz_localize(None)
+    return utc.to_numpy("datetime64[ns]").astype("int64") / 1e9
+
+
+def _timestamp(t):
+    if t is None or isinstance(t, (int, float)):
+        return t
+    return float(_local_epoch([t])[0])
+
+
+def iter_metrics(
+    trial: sireo.core.Trial | str,
+    series: str | None = "",
+    columns: typing.Sequence[str] | None = None,
+    start=None,
+    end=None,
+    uid: str | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Lazily read metrics of the trial, yields one DataFrame per chunk.
+
+    `series=None` reads all series and adds a `series` column, `uid`
+    selects chunks of a single (infused) tracker, `""` - trial's own.
+    Rows are filtered by `start <= at < end`.
+    """
+    import numpy as np
+
+    if not isinstance(trial, sireo.core.Trial):
+        trial = sireo.core.Trial(trial)
+    start, end = _timestamp(start), _timestamp(end)
+    if columns is not None and "at" not in columns:
+        columns = ["at", *columns]
+
+    # streams of every writer are ordered by time
+    finished_streams = set()
+    for c in find_metrics_chunks(trial):
+        if series is not None and c.series != series:
+            continue
+        if uid is not None and c.uid != uid:
+            continue
+        if (c.uid, c.series) in finished_streams:
+            continue
+
+        logger.debug("read metrics chunk %s", c.path)
+        with trial._fs.open(c.path, "rb") as f:
+            df = read_metrics_file(f, c.format, columns=columns)
+
+        if start is not None or end is not None:
+            at = df["at"]
+            if end is not None and len(at) and at.iloc[0] >= end:
+                finished_streams.add((c.uid, c.series))
+                continue
+            mask = np.ones(len(df), dtype=bool)
+            if start is not None:
+                mask &= at >= start
+            if end is not None:
+                mask &= at < end
+            df = df[mask]
+
+        if series is None:
+            df = df.assign(series=c.series)
+        if len(df):
+            yield df
+
+
+def load_metrics(trial: sireo.core.Trial | str, iterator=False, **kwargs):
+    """Load metrics of the trial into single DataFrame.
+
+    With `iterator=True` returns an iterator over per-chunk DataFrames
+    instead, see `iter_metrics` for other arguments.
+    """
+    import pandas as pd
+
+    it = iter_metrics(trial, **kwargs)
+    if iterator:
+        return it
+    dfs = list(it)
+    if not dfs:
+        return pd.DataFrame(columns=kwargs.get("columns"))
+    return pd.concat(dfs, ignore_index=True)
@@ -0,0 +1,94 @@
+"""Timers of sireo's own work, to see how much time tracking adds to trials.
+
+Disabled by default, enable with `sireo.overhead.enable()` or by setting
+`SIREO_OVERHEAD=1` before trials are created. Timings are accumulated per
+trial (written as `info.sireo_overhead` when the trial finishes, also
+available as `trial_stats(tracker)`) and per process (`stats()`).
+
+Timers nest, e.g. `tracker.flush` includes `hook.flush` and `metrics.flush`.
+"""
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+import typing
+
+_enabled = os.environ.get("SIREO_OVERHEAD", "") not in ("", "0")
+_lock = threading.Lock()
+# name -> [count, seconds]
+_totals: typing.Dict[str, list] = {}
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def disable() -> None:
+    enable(False)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _stats(counters) -> typing.Dict[str, typing.Dict]:
+    return {
+        k: {"count": cnt, "seconds": round(secs, 6)}
+        for k, (cnt, secs) in sorted(counters.items())
+    }
+
+
+def stats() -> typing.Dict[str, typing.Dict]:
+    """Timings of all trials of the process."""
+    with _lock:
+        return _stats(_totals)
+
+
+def trial_stats(tracker) -> typing.Dict[str, typing.Dict]:
+    with _lock:
+        return _stats(getattr(tracker, "_overhead", {}))
+
+
+def reset() -> None:
+    with _lock:
+        _totals.clear()
+
+
+def add(tracker, name: str, seconds: float) -> None:
+    with _lock:
+        c = _totals.setdefault(name, [0, 0.0])
+        c[0] += 1
+        c[1] += seconds
+        if tracker is not None:
+            if "_overhead" not in tracker.__dict__:
+                tracker._overhead = {}
+            c = tracker._overhead.setdefault(name, [0, 0.0])
+            c[0] += 1
+            c[1] += seconds
+
+
+def method_tracker(self, *args):
+    return self
+
+
+def timed(name: str, tracker: typing.Callable | None = None):
+    """Time calls of the decorated function, `tracker` gets it from arguments."""
+
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                t = tracker(*args) if tracker is not None else None
+                add(t, name, time.perf_counter() - start)
+
+        return wrapper
+
+    return deco
@@ -0,0 +1,204 @@
+"""Opt-in profiling of trials.
+
+Profiler wraps the run of the trial function and attaches its results to
+the trial, `profile.pstats` for `cprofile` (load with `pstats.Stats`),
+`profile.folded` for `sample` (collapsed stacks, input of flame graph tools)
+and `alloc-top.txt` for `tracemalloc`. Total time and peak allocation are
+informed as `info.profile`.
+
+Profiling is enabled for all trials of the runner (`sireo.init(profile=...)`)
+or for a tracked function (`@sireo.track(profile=...)`), `rate` limits the
+share of profiled trials, e.g. in large sweeps.
+"""
+from __future__ import annotations
+
+import collections
+import contextlib
+import contextvars
+import logging
+import marshal
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+import sireo
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cprofile", "sample", "tracemalloc")
+
+# profiler requested by `@sireo.track(profile=...)`, overrides runner's one
+_var_profiler = contextvars.ContextVar("sireo_profiler", default=None)
+
+
+class Profiler:
+    def __init__(
+        self,
+        mode: str = "cprofile",
+        rate: float = 1.0,
+        top: int = 50,
+        interval: float = 0.005,
+    ):
+        if mode not in MODES:
+            raise ValueError(
+                f"unknown profiling mode {mode!r}, expected one of {MODES}"
+            )
+        self.mode = mode
+        self.rate = rate
+        self.top = top
+        self.interval = interval
+
+    def sampled(self) -> bool:
+        """Decide whether the next trial is profiled."""
+        return self.rate >= 1 or random.random() < self.rate
+
+    @contextlib.contextmanager
+    def profile(self, tracker: sireo.core.Tracker):
+        run = {
+            "cprofile": self._cprofile,
+            "sample": self._sample,
+            "tracemalloc": self._tracemalloc,
+        }[self.mode]
+        info = {"mode": self.mode}
+        start = time.perf_counter()
+        try:
+            with run(tracker, info):
+                yield
+        finally:
+            info["total_time"] = time.perf_counter() - start
+            tracker.inform(profile=info)
+
+    @contextlib.contextmanager
+    def _cprofile(self, tracker, info):
+        import cProfile
+
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError as e:
+            # python 3.12+ allows only one active profiler
+            logger.warning("trial %s is not profiled: %s", tracker.tid, e)
+            yield
+            return
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.create_stats()
+            with tracker.attach("profile.pstats", "wb") as f:
+                # format of `pstats.Stats.dump_stats`
+                marshal.dump(prof.stats, f)
+
+    @contextlib.contextmanager
+    def _sample(self, tracker, info):
+        sampler = _StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            info["samples"] = sum(sampler.stacks.values())
+            with tracker.attach("profile.folded", "wt") as f:
+                for stack, cnt in sampler.stacks.most_common():
+                    f.write(f"{stack} {cnt}\n")
+
+    @contextlib.contextmanager
+    def _tracemalloc(self, tracker, info):
+        with _tracing():
+            tracemalloc.reset_peak()
+            try:
+                yield
+            finally:
+                info["alloc_peak"] = tracemalloc.get_traced_memory()[1]
+                stats = tracemalloc.take_snapshot().statistics("lineno")
+                with tracker.attach("alloc-top.txt", "wt") as f:
+                    for s in stats[: self.top]:
+                        f.write(f"{s}\n")
+
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+@contextlib.contextmanager
+def _tracing():
+    # tracemalloc is global, it's shared by trials running in threads
+    # and left alone when it was started by somebody else
+    global _tracing_users
+    with _tracing_lock:
+        owner = _tracing_users > 0 or not tracemalloc.is_tracing()
+        if owner:
+            if _tracing_users == 0:
+                tracemalloc.start(25)
+            _tracing_users += 1
+    try:
+        yield
+    finally:
+        if owner:
+            with _tracing_lock:
+                _tracing_users -= 1
+                if _tracing_users == 0:
+                    tracemalloc.stop()
+
+
+class _StackSampler(threading.Thread):
+    def __init__(self, thread_id, interval):
+        threading.Thread.__init__(self, name="sireo-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.stacks = collections.Counter()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def coerce_to_profiler(profile: str | Profiler | bool | None) -> Profiler | None:
+    if profile is None or profile is False:
+        return None
+    if profile is True:
+        return Profiler()
+    if isinstance(profile, Profiler):
+        return profile
+    return Profiler(profile)
+
+
+@contextlib.contextmanager
+def requested(profile: str | Profiler | bool | None):
+    """Request profiling for trials created in the block, `False` disables it."""
+    if profile is None:
+        yield
+        return
+    token = _var_profiler.set(
+        profile if profile is False else coerce_to_profiler(profile)
+    )
+    try:
+        yield
+    finally:
+        _var_profiler.reset(token)
+
+
+def trial_profiler(default: Profiler | None) -> Profiler | None:
+    """Profiler of the trial which is created now, if it is sampled."""
+    p = _var_profiler.get()
+    if p is None:
+        p = default
+    if p and p.sampled():
+        return p
+    return None
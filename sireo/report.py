@@ -0,0 +1,129 @@
+"""Incremental report over `sireo.yaml` files of the results tree."""
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import os
+import threading
+import typing
+
+from sireo.catalog import trial_row
+from sireo.data import RECORD_FORMATS, load_trial_file, path_fs
+
+if typing.TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+_PREFERENCE = {f: i for i, f in enumerate([*RECORD_FORMATS, "yaml"])}
+
+
+def _signature(info: typing.Mapping):
+    mtime = info.get("mtime") or info.get("LastModified") or info.get("last_modified")
+    return (mtime, info.get("size"), info.get("ETag"))
+
+
+def _load_row(root: str, path: str, meta: bool) -> typing.Dict | None:
+    fs = path_fs(root)
+    try:
+        with fs.open(path, "rb") as f:
+            data = load_trial_file(f, path)
+    except Exception:
+        logger.exception("failed to load %s", path)
+        return None
+    rel = os.path.relpath(os.path.dirname(path), fs._strip_protocol(root))
+    return trial_row(data, rel, meta=meta)
+
+
+class ReportBuilder:
+    """Builds report from the tree, reparsing only changed trials.
+
+    Parsed trials are cached by (path, mtime, size), changed ones are
+    parsed on a thread (or process) pool.
+    """
+
+    def __init__(self, root, max_workers=None, executor="thread", meta=True):
+        self.root = str(root)
+        self.fs = path_fs(self.root)
+        self.max_workers = max_workers
+        self.executor = executor
+        self.meta = meta
+        self._cache: typing.Dict[str, typing.Tuple[typing.Any, typing.Dict]] = {}
+        self._lock = threading.Lock()
+
+    def _list(self) -> typing.Dict[str, typing.Mapping]:
+        """Trial files by path, records are preferred over `sireo.yaml`."""
+        files = self.fs.glob(f"{self.root}/**/sireo.*", detail=True)
+        found = {}
+        for p in sorted(files, key=lambda p: _PREFERENCE.get(p.rsplit(".", 1)[-1], 99)):
+            d = p.rsplit("/", 1)[0]
+            if p.rsplit(".", 1)[-1] in _PREFERENCE and d not in found:
+                found[d] = p
+        return {p: files[p] for p in found.values()}
+
+    def _parse(self, paths: typing.List[str]) -> typing.Iterator:
+        if len(paths) < 16:
+            return (_load_row(self.root, p, self.meta) for p in paths)
+        if self.executor == "process":
+            pool = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+        else:
+            pool = concurrent.futures.ThreadPoolExecutor(self.max_workers)
+        with pool:
+            n = len(paths)
+            return list(
+                pool.map(
+                    _load_row,
+                    [self.root] * n,
+                    paths,
+                    [self.meta] * n,
+                    chunksize=64 if self.executor == "process" else 1,
+                )
+            )
+
+    def rows(self) -> typing.List[typing.Dict]:
+        """Nested rows of all trials, ordered by path."""
+        with self._lock:
+            listing = self._list()
+            for p in self._cache.keys() - listing.keys():
+                del self._cache[p]
+
+            changed = {
+                p: _signature(info)
+                for p, info in listing.items()
+                if p not in self._cache
+                or self._cache[p][0] != _signature(info)
+                or _signature(info)[0] is None
+            }
+            logger.debug("parse %d of %d trials", len(changed), len(listing))
+            for (p, sig), row in zip(changed.items(), self._parse(list(changed))):
+                if row is None:
+                    self._cache.pop(p, None)
+                else:
+                    self._cache[p] = (sig, row)
+
+            return [self._cache[p][1] for p in sorted(self._cache)]
+
+    def build(self) -> pd.DataFrame:
+        """Report with nested params/info/meta flattened into columns."""
+        import pandas as pd
+
+        df = pd.json_normalize(self.rows(), sep=".")
+        for c in ("created", "started", "finished"):
+            if c in df:
+                df[c] = pd.to_datetime(df[c])
+        return df
+
+
+_builders: typing.Dict[typing.Tuple, ReportBuilder] = {}
+_builders_lock = threading.Lock()
+
+
+def load_report(root, **kwargs) -> pd.DataFrame:
+    """Report from the tree, parsed trials are cached between calls."""
+    key = (str(root), *sorted(kwargs.items()))
+    with _builders_lock:
+        builder = _builders.get(key)
+        if builder is None:
+            builder = _builders[key] = ReportBuilder(root, **kwargs)
+    return builder.build()
@@ -0,0 +1,152 @@
+"""Sampling of resources used by trials.
+
+`ResourceSampler` hook samples CPU time, RSS and I/O of the process in a
+background thread, samples are written as the `resources` metric series and
+peaks are informed as `info.resources`. The thread writes samples through its
+own exporter (`metrics-<uid>-NNNN-resources` chunks) every `flush_interval`
+seconds, so they survive trials which are killed. Resources are per process,
+so trials running concurrently in threads of one process share the readings.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+import sireo
+from sireo import hook
+
+logger = logging.getLogger(__name__)
+
+SERIES = "resources"
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def _read_rss() -> dict:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return {"rss": int(f.read().split()[1]) * _PAGE_SIZE}
+    except OSError:
+        return {}
+
+
+def _read_io() -> dict:
+    try:
+        with open("/proc/self/io", "rb") as f:
+            fields = dict(line.split(b":", 1) for line in f)
+    except OSError:
+        # not on Linux or restricted by ptrace access mode
+        return {}
+    return {k: int(fields[k.encode()]) for k in ("read_bytes", "write_bytes")}
+
+
+def sample() -> dict:
+    """Resource usage of the process, fields missing on the platform are omitted."""
+    t = os.times()
+    s = {"cpu": t.user + t.system}
+    s.update(_read_rss())
+    s.update(_read_io())
+    return s
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, interval, series, tracker: sireo.core.InfusedTracker):
+        threading.Thread.__init__(self, name="sireo-resources", daemon=True)
+        self.interval = interval
+        self.series = series
+        # used only by this thread, until it's stopped
+        self.tracker = tracker
+        self.stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._first = self._last = (time.time(), sample())
+        self.peaks = {}
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.take()
+
+    def take(self):
+        now, s = time.time(), sample()
+        (_, s0), (t1, s1) = self._first, self._last
+        row = {"cpu_percent": 100 * (s["cpu"] - s1["cpu"]) / max(now - t1, 1e-6)}
+        # cumulative values are relative to the start of the trial
+        for k, v in s.items():
+            row[k] = v if k == "rss" else v - s0[k]
+        self._last = now, s
+        # exporter writes a chunk once the oldest sample is `max_age` old
+        self.tracker.meter(row, series=self.series)
+        with self._lock:
+            for k in ("rss", "cpu_percent"):
+                if k in row:
+                    self.peaks[f"{k}_peak"] = max(
+                        self.peaks.get(f"{k}_peak", 0), row[k]
+                    )
+            self.peaks.update(
+                (f"{k}_total", row[k])
+                for k in ("cpu", "read_bytes", "write_bytes")
+                if k in row
+            )
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.take()
+        self.tracker.metrics.close()
+
+
+class ResourceSampler(hook.Hook):
+    """Hook sampling resources of the process every `interval` seconds.
+
+    Samples are written at least every `flush_interval` seconds.
+    """
+
+    def __init__(
+        self, interval: float = 1.0, series: str = SERIES, flush_interval: float = 30.0
+    ):
+        self.interval = interval
+        self.series = series
+        self.flush_interval = flush_interval
+        self._samplers: dict[str, _Sampler] = {}
+
+    def __getstate__(self):
+        # samplers are running in the process of the tracker
+        state = dict(self.__dict__)
+        state["_samplers"] = {}
+        return state
+
+    def _start(self, tracker: sireo.core.Tracker):
+        # exporter of the trial isn't shared with other threads, samples are
+        # written by an infused tracker which doesn't dispatch to hooks
+        infused = sireo.core.InfusedTracker(
+            path=tracker.path,
+            tid=tracker.tid,
+            hook=None,
+            metrics_options={
+                **tracker.metrics_options,
+                "max_age": self.flush_interval,
+                "background": False,
+            },
+        )
+        s = self._samplers[tracker.uid] = _Sampler(self.interval, self.series, infused)
+        s.start()
+
+    def on_tracker_start(self, tracker: sireo.core.Tracker):
+        self._start(tracker)
+
+    def on_tracker_flush(self, tracker: sireo.core.Tracker):
+        state = getattr(tracker, "data", {}).get("state")
+        if tracker.uid not in self._samplers and state == "resumed":
+            # resumed trials don't start again, infused trackers have no state
+            self._start(tracker)
+
+    def on_tracker_finish(self, tracker: sireo.core.Tracker):
+        s = self._samplers.pop(tracker.uid, None)
+        if s is None:
+            return
+        s.stop()
+        tracker.inform(resources=dict(s.peaks))
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import contextvars
 import logging
+import time
 import typing
 
 import sireo
 
-from . import core, meta
+from . import catalog as catalog_mod
+from . import core, data
+from . import hook as hook_mod
+from . import memo, meta, overhead, profiling
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +48,9 @@ class ARunner(typing.Protocol):
     def run(self, tid, fn, /, **kwargs) -> core.Trial:
         ...
 
+    async def arun(self, tid, fn, /, **kwargs) -> core.Trial:
+        ...
+
     def close(self) -> None:
         ...
 
@@ -55,35 +65,172 @@ class BaseRunner(ARunner):
 
     name = None
 
-    def __init__(self, path, metap=None, hook=None) -> None:
+    def __init__(
+        self,
+        path,
+        metap=None,
+        hook=None,
+        memoize=False,
+        metrics_options=None,
+        catalog=False,
+        record_format=None,
+        snapshot_options=None,
+        profile=None,
+    ) -> None:
+        if record_format is not None:
+            data._require_record_format(record_format)
+        if (snapshot_options or {}).get("compression") is not None:
+            data._require_compression(snapshot_options["compression"])
         self.path = path
         self.metap = metap
         self.hook = hook
+        self.memo = None
+        self.catalog = None
+        self.metrics_options = metrics_options
+        self.record_format = record_format
+        self.snapshot_options = snapshot_options
+        self.profiler = profiling.coerce_to_profiler(profile)
+
+        hooks = []
+        if memoize:
+            self.memo = memo.TrialIndex(path)
+            hooks.append(memo.MemoHook(self.memo))
+        if catalog and catalog_mod._is_local(path):
+            self.catalog = catalog_mod.Catalog(path)
+            hooks.append(catalog_mod.CatalogHook(self.catalog))
+        elif catalog:
+            logger.info("Catalog is not supported for %s", path)
+        if hooks:
+            self.hook = hook_mod.HooksCollection(
+                [hook_mod.coerce_to_hook(hook), *hooks]
+            )
+
+    def lookup(self, fn, params) -> typing.Tuple[str | None, core.Trial | None]:
+        if self.memo is None:
+            return None, None
+        key = memo.trial_key(fn, params)
+        if key is None:
+            return None, None
+        trial = self.memo.get(key)
+        if trial is not None:
+            logger.info("Reuse memoized trial %s", trial.path)
+        return key, trial
 
     def run(self, tid, fn, /, **kwargs):
-        tracker = self.create_tracker(tid, fn, kwargs)
-        self.run_with_tracker(tracker, fn, kwargs)
+        key, trial = self.lookup(fn, kwargs)
+        if trial is not None:
+            return trial
+        tracker = self.create_tracker(tid, fn, kwargs, key=key)
+        return self.run_with_tracker(tracker, fn, kwargs)
+
+    def sweep(
+        self,
+        fn,
+        trials: typing.Iterable[typing.Tuple[str, typing.Dict]],
+        max_concurrency: int | None = None,
+    ) -> typing.Iterator[core.Trial]:
+        meta, meta_time = self._timed_capture_meta()
+        if overhead.enabled():
+            # shared by trials of the sweep, so it's accounted to the process
+            overhead.add(None, "meta.capture", meta_time)
+        inflight: typing.Dict[concurrent.futures.Future, core.FutureTrial] = {}
+
+        def _finished(block):
+            if block:
+                done, _ = concurrent.futures.wait(
+                    inflight, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+            else:
+                done = [f for f in inflight if f.done()]
+            for f in done:
+                yield inflight.pop(f)
+
+        for tid, params in trials:
+            key, trial = self.lookup(fn, params)
+            if trial is None:
+                tracker = self.create_tracker(tid, fn, params, key=key, meta=meta)
+                trial = self.run_with_tracker(tracker, fn, params)
+
+            if isinstance(trial, core.FutureTrial):
+                inflight[trial.future] = trial
+                yield from _finished(False)
+                while max_concurrency and len(inflight) >= max_concurrency:
+                    yield from _finished(True)
+            else:
+                yield trial
+
+        while inflight:
+            yield from _finished(True)
+
+    async def arun(self, tid, fn, /, **kwargs):
+        key, trial = self.lookup(fn, kwargs)
+        if trial is not None:
+            return trial
+        tracker = self.create_tracker(tid, fn, kwargs, key=key)
+        await _arun_tracker(tracker, fn, kwargs)
         return core.Trial(tracker.path)
 
     def capture_meta(self):
         return meta.capture_meta(self.metap) if self.metap else {}
 
-    def create_tracker(self, tid, func, params):
+    def _timed_capture_meta(self):
+        start = time.perf_counter()
         meta = self.capture_meta()
-        return core.Tracker(
+        return meta, time.perf_counter() - start
+
+    def create_tracker(self, tid, func, params, key=None, meta=None):
+        meta_time = None
+        if meta is None:
+            meta, meta_time = self._timed_capture_meta()
+        tracker = core.Tracker(
             path=f"{self.path}/{tid}",
             meta=meta,
             tid=tid,
             hook=self.hook,
+            key=key,
+            metrics_options=self.metrics_options,
+            record_format=self.record_format,
+            snapshot_options=self.snapshot_options,
+            profiler=profiling.trial_profiler(self.profiler),
         )
+        if meta_time is not None and overhead.enabled():
+            overhead.add(tracker, "meta.capture", meta_time)
+        return tracker
 
     def close(self):
         pass
 
-    def run_with_tracker(self, tracker: core.Tracker, fn, params: typing.Dict):
+    def run_with_tracker(
+        self, tracker: core.Tracker, fn, params: typing.Dict
+    ) -> core.Trial:
         raise NotImplementedError
 
 
+def _run_tracker(tracker: core.Tracker, fn, params):
+    # worker threads/processes may inherit tracker of the submitting code,
+    # so every trial runs in a clean context
+    def _run():
+        with sireo.using_tracker(tracker):
+            tracker.run(fn, **params)
+
+    contextvars.Context().run(_run)
+
+
+async def _arun_tracker(tracker: core.Tracker, fn, params):
+    # run as separate task, so tracker is set only in a copy of the context
+    async def _arun():
+        sireo._var_tracker.set(None)
+        with sireo.using_tracker(tracker):
+            await tracker.arun(fn, **params)
+
+    await asyncio.ensure_future(_arun())
+
+
+def _run_dilled_tracker(payload: bytes):
+    tracker, fn, params = sireo.dill.loads(payload)
+    _run_tracker(tracker, fn, params)
+
+
 class InplaceRunner(BaseRunner):
 
     runner_name = "inplace"
@@ -91,3 +238,83 @@ class InplaceRunner(BaseRunner):
     def run_with_tracker(self, tracker: core.Tracker, fn, params):
         with sireo.using_tracker(tracker):
             tracker.run(fn, **params)
+        return core.Trial(tracker.path)
+
+
+class PoolRunner(BaseRunner):
+    """Base for runners which execute trials on `concurrent.futures` executor."""
+
+    def __init__(self, path, max_workers=None, **kwargs) -> None:
+        BaseRunner.__init__(self, path, **kwargs)
+        self.max_workers = max_workers
+        self._executor = None
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            logger.debug("Create executor for %s", self)
+            self._executor = self.create_executor()
+        return self._executor
+
+    def create_executor(self) -> concurrent.futures.Executor:
+        raise NotImplementedError
+
+    def submit_tracker(self, tracker: core.Tracker, fn, params):
+        return self.executor.submit(_run_tracker, tracker, fn, params)
+
+    def run_with_tracker(self, tracker: core.Tracker, fn, params):
+        future = self.submit_tracker(tracker, fn, params)
+        return core.FutureTrial(tracker.path, future)
+
+    def close(self):
+        if self._executor is not None:
+            logger.debug("Shutdown executor of %s", self)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class ThreadRunner(PoolRunner):
+
+    runner_name = "threads"
+
+    def create_executor(self):
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="sireo-runner",
+        )
+
+
+class AsyncRunner(BaseRunner):
+    """Runs `async def` functions and async generators on the event loop.
+
+    Use `await sireo.arun(...)` (or tracked async functions) to run
+    trials concurrently, `sireo.run(...)` starts a new event loop per trial.
+    """
+
+    runner_name = "async"
+
+    def run_with_tracker(self, tracker: core.Tracker, fn, params):
+        asyncio.run(_arun_tracker(tracker, fn, params))
+        return core.Trial(tracker.path)
+
+
+class ProcessRunner(PoolRunner):
+
+    runner_name = "process"
+
+    def __init__(self, path, max_workers=None, mp_context=None, **kwargs) -> None:
+        PoolRunner.__init__(self, path, max_workers=max_workers, **kwargs)
+        self.mp_context = mp_context
+
+    def create_executor(self):
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self.mp_context,
+        )
+
+    def submit_tracker(self, tracker: core.Tracker, fn, params):
+        if sireo.dill:
+            # `dill` handles lambdas, closures and functions from `__main__`
+            payload = sireo.dill.dumps((tracker, fn, params))
+            return self.executor.submit(_run_dilled_tracker, payload)
+        return self.executor.submit(_run_tracker, tracker, fn, params)
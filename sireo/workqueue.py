@@ -0,0 +1,301 @@
+"""Work queue over a shared filesystem.
+
+Trials submitted with `runner="queue"` are written as task files to
+`<path>/.sireo-queue/pending`. Workers (`python -m sireo.workqueue PATH`)
+claim tasks by renaming them into `running/<uid>.<worker>.task`, keep a
+`running/<uid>.<worker>.lease` file fresh while the trial runs and drop a
+`done/<uid>` marker when it is finished. Tasks whose lease has expired are
+re-claimed by other workers, the trial is resumed from its last snapshot.
+Tasks which fail outside of the trial function (e.g. in hooks or when the
+task can't be loaded) get the traceback in their `done/<uid>` marker and
+their trials raise `TrialFailedException`.
+
+Leases hold wall-clock expiry times, so clocks of the workers should be
+roughly in sync.
+"""
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import logging
+import os
+import pickle
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+import sireo
+from sireo import core, runner
+from sireo.data import path_fs
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DIR = ".sireo-queue"
+
+
+def _dumps(x) -> bytes:
+    return (sireo.dill or pickle).dumps(x)
+
+
+def _loads(b: bytes):
+    return (sireo.dill or pickle).loads(b)
+
+
+def _basename(p: str) -> str:
+    return p.rstrip("/").rsplit("/", 1)[-1]
+
+
+class WorkQueue:
+    """Directory layout of the queue, shared by submitters and workers."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.root = f"{self.path}/{QUEUE_DIR}"
+        self.fs = path_fs(self.root)
+
+    def _dir(self, name):
+        return f"{self.root}/{name}"
+
+    def _ls(self, name) -> list[str]:
+        try:
+            return sorted(
+                _basename(p) for p in self.fs.ls(self._dir(name), detail=False)
+            )
+        except FileNotFoundError:
+            return []
+
+    def submit(self, tracker: core.Tracker, fn, params) -> None:
+        payload = _dumps((tracker, fn, params))
+        tmp = self._dir(f"pending/.{tracker.uid}.tmp")
+        self.fs.pipe_file(tmp, payload)
+        # rename, so workers never see partially written tasks
+        self.fs.mv(tmp, self._dir(f"pending/{tracker.uid}.task"))
+
+    def pending(self) -> list[str]:
+        return [n[: -len(".task")] for n in self._ls("pending") if n.endswith(".task")]
+
+    def running(self) -> list[tuple[str, str]]:
+        return [
+            tuple(n[: -len(".task")].split(".", 1))
+            for n in self._ls("running")
+            if n.endswith(".task")
+        ]
+
+    def finished(self) -> list[str]:
+        return self._ls("done")
+
+    def finished_error(self, uid) -> str:
+        """Traceback of task which failed outside of the trial function."""
+        return self.fs.cat_file(self._dir(f"done/{uid}")).decode()
+
+    def forget_finished(self, uid) -> None:
+        self.fs.rm_file(self._dir(f"done/{uid}"))
+
+    def task_path(self, uid, worker=None) -> str:
+        if worker is None:
+            return self._dir(f"pending/{uid}.task")
+        return self._dir(f"running/{uid}.{worker}.task")
+
+    def lease_path(self, uid, worker) -> str:
+        return self._dir(f"running/{uid}.{worker}.lease")
+
+    def write_lease(self, uid, worker, timeout) -> None:
+        self.fs.pipe_file(
+            self.lease_path(uid, worker), str(time.time() + timeout).encode()
+        )
+
+    def lease_expired(self, uid, worker) -> bool:
+        try:
+            expires = float(self.fs.cat_file(self.lease_path(uid, worker)))
+        except (FileNotFoundError, ValueError):
+            return True
+        return expires < time.time()
+
+    def _rm(self, p) -> None:
+        try:
+            self.fs.rm_file(p)
+        except FileNotFoundError:
+            pass
+
+    def claim(self, uid, worker, timeout, owner=None) -> bool:
+        """Atomically move task to `worker`, returns `False` if somebody was faster."""
+        self.write_lease(uid, worker, timeout)
+        try:
+            self.fs.mv(self.task_path(uid, owner), self.task_path(uid, worker))
+        except FileNotFoundError:
+            self._rm(self.lease_path(uid, worker))
+            return False
+        if owner is not None:
+            self._rm(self.lease_path(uid, owner))
+        return True
+
+    def complete(self, uid, worker, error: str = "") -> None:
+        self.fs.pipe_file(self._dir(f"done/{uid}"), error.encode())
+        self._rm(self.task_path(uid, worker))
+        self._rm(self.lease_path(uid, worker))
+
+
+class _Heartbeat(threading.Thread):
+    def __init__(self, queue: WorkQueue, uid, worker, lease, interval):
+        threading.Thread.__init__(self, name=f"sireo-heartbeat-{uid}", daemon=True)
+        self.queue = queue
+        self.uid = uid
+        self.worker = worker
+        self.lease = lease
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if not self.queue.fs.exists(self.queue.task_path(self.uid, self.worker)):
+                logger.warning("task %s was re-claimed by another worker", self.uid)
+                return
+            self.queue.write_lease(self.uid, self.worker, self.lease)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class Worker:
+    def __init__(
+        self,
+        path,
+        worker_id: str | None = None,
+        lease: float = 60.0,
+        heartbeat: float | None = None,
+        poll_interval: float = 1.0,
+    ):
+        self.queue = WorkQueue(path)
+        self.worker_id = (
+            worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.lease = lease
+        self.heartbeat = heartbeat or lease / 3
+        self.poll_interval = poll_interval
+
+    def claim_next(self) -> str | None:
+        for uid in self.queue.pending():
+            if self.queue.claim(uid, self.worker_id, self.lease):
+                logger.info("claimed trial %s", uid)
+                return uid
+        for uid, owner in self.queue.running():
+            if owner != self.worker_id and self.queue.lease_expired(uid, owner):
+                if self.queue.claim(uid, self.worker_id, self.lease, owner=owner):
+                    logger.info("re-claimed trial %s from %s", uid, owner)
+                    return uid
+        return None
+
+    def process(self, uid) -> None:
+        hb = _Heartbeat(self.queue, uid, self.worker_id, self.lease, self.heartbeat)
+        hb.start()
+        error = ""
+        try:
+            tracker, fn, params = _loads(
+                self.queue.fs.cat_file(self.queue.task_path(uid, self.worker_id))
+            )
+            # resumes from `snapshot.pickle` when the trial was re-claimed
+            runner._run_tracker(tracker, fn, params)
+        except Exception:
+            # failures of the trial function are recorded by the tracker,
+            # these come from loading the task, hooks or storage, re-claiming
+            # the task would fail again
+            logger.exception("task %s failed", uid)
+            error = traceback.format_exc()
+        finally:
+            hb.stop()
+        self.queue.complete(uid, self.worker_id, error)
+
+    def work(self, max_idle: float | None = None) -> int:
+        """Process trials until the queue is idle for `max_idle` seconds."""
+        cnt = 0
+        idle_since = time.monotonic()
+        while True:
+            uid = self.claim_next()
+            if uid is not None:
+                self.process(uid)
+                cnt += 1
+                idle_since = time.monotonic()
+            elif max_idle is not None and time.monotonic() - idle_since >= max_idle:
+                return cnt
+            else:
+                time.sleep(self.poll_interval)
+
+
+def work(path, max_idle: float | None = None, **kwargs) -> int:
+    return Worker(path, **kwargs).work(max_idle=max_idle)
+
+
+class QueueRunner(runner.BaseRunner):
+    runner_name = "queue"
+
+    def __init__(self, path, poll_interval=1.0, **kwargs) -> None:
+        runner.BaseRunner.__init__(self, path, **kwargs)
+        self.queue = WorkQueue(path)
+        self.poll_interval = poll_interval
+        self._futures: dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._poller = None
+        self._stopped = threading.Event()
+
+    def run_with_tracker(self, tracker: core.Tracker, fn, params):
+        future = concurrent.futures.Future()
+        with self._lock:
+            self._futures[tracker.uid] = future
+            if self._poller is None:
+                self._poller = threading.Thread(
+                    target=self._poll, name="sireo-queue-poller", daemon=True
+                )
+                self._poller.start()
+        self.queue.submit(tracker, fn, params)
+        return core.FutureTrial(tracker.path, future)
+
+    def _poll(self):
+        while not self._stopped.wait(self.poll_interval):
+            for uid in self.queue.finished():
+                with self._lock:
+                    future = self._futures.pop(uid, None)
+                if future is None:
+                    continue
+                error = self.queue.finished_error(uid)
+                self.queue.forget_finished(uid)
+                if error:
+                    future.set_exception(
+                        core.TrialFailedException(
+                            error.rstrip().rsplit("\n", 1)[-1], error
+                        )
+                    )
+                else:
+                    future.set_result(None)
+
+    def close(self):
+        self._stopped.set()
+        if self._poller is not None:
+            self._poller.join()
+            self._poller = None
+        with self._lock:
+            for f in self._futures.values():
+                f.cancel()
+            self._futures.clear()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run sireo queue worker")
+    parser.add_argument("path", help="results path given to `sireo.init`")
+    parser.add_argument("--lease", type=float, default=60.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--max-idle", type=float, default=None)
+    ns = parser.parse_args(args)
+    logging.basicConfig(level=logging.INFO)
+    work(
+        ns.path,
+        max_idle=ns.max_idle,
+        lease=ns.lease,
+        poll_interval=ns.poll_interval,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Tests for `sireo.catalog` module."""
+
+import os
+
+import pytest
+
+import sireo
+from sireo import catalog, report
+
+
+def calc(x, opts):
+    sireo.inform(double=2 * x)
+    if x < 0:
+        raise ValueError(x)
+    return {"y": x + opts["shift"]}
+
+
+def test_load_report(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=True)
+    for x in (-1, 1, 2):
+        sireo.run(f"calc/{x}", calc, x=x, opts={"shift": 10})
+
+    df = sireo.load_report()
+    assert len(df) == 3
+    assert df["tid"].tolist() == ["calc/-1", "calc/1", "calc/2"]
+    assert df["state"].tolist() == ["fail", "done", "done"]
+    assert df["params.opts.shift"].tolist() == [10, 10, 10]
+    assert df["info.double"].tolist() == [-2, 2, 4]
+    assert df["result.y"].tolist()[1:] == [11, 12]
+    assert df["finished"].dtype.kind == "M"
+
+    os.remove(tmp_path / catalog.CATALOG_FILE)
+    rebuilt = sireo.load_report(str(tmp_path))
+    assert rebuilt.sort_index(axis=1).equals(df.sort_index(axis=1))
+
+
+def test_catalog_requires_local_fs():
+    with pytest.raises(ValueError):
+        catalog.Catalog("s3://bucket/results")
+
+
+def test_catalog_is_opt_in(tmp_path, monkeypatch):
+    parsed = []
+    load_row = report._load_row
+    monkeypatch.setattr(
+        report, "_load_row", lambda *args: parsed.append(1) or load_row(*args)
+    )
+    sireo.init(path=str(tmp_path), meta_providers={"host": lambda: "box"})
+    sireo.run("calc/1", calc, x=1, opts={"shift": 10})
+    # report is built from the tree when the runner doesn't maintain catalog
+    df = sireo.load_report()
+    assert df["info.double"].tolist() == [2]
+    # same columns as in the catalog
+    assert "meta.host" not in df
+    sireo.run("calc/2", calc, x=2, opts={"shift": 10})
+    assert sireo.load_report()["tid"].tolist() == ["calc/1", "calc/2"]
+    sireo.load_report()
+    # only new trials are parsed
+    assert len(parsed) == 2
+    assert not os.path.exists(tmp_path / catalog.CATALOG_FILE)
+
+
+def test_catalog_failure_does_not_fail_trial(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=True)
+    # sqlite can't open a directory
+    os.makedirs(tmp_path / catalog.CATALOG_FILE)
+    t = sireo.run("calc/1", calc, x=1, opts={"shift": 10})
+    assert t.data.state == "done"
@@ -0,0 +1,76 @@
+"""Tests for `sireo.core` module."""
+
+import sireo
+from sireo import core, data, runner
+
+
+class Steps:
+    """Picklable iterator, so trial can be snapshotted."""
+
+    def __init__(self, n):
+        self.i = 0
+        self.n = n
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self.i += 1
+        if self.i == self.n:
+            sireo.inform(n=self.n)
+        sireo.snapshot()
+        return self.n if self.i > self.n else None
+
+
+def test_flush_skips_unchanged_data(tmp_path, monkeypatch):
+    written = []
+    write_data = core.Tracker._write_data
+    monkeypatch.setattr(
+        core.Tracker,
+        "_write_data",
+        lambda self, text: written.append(text) or write_data(self, text),
+    )
+    sireo.init(path=str(tmp_path), catalog=False)
+    t = sireo.run("steps", Steps, n=3)
+    assert t.result == 3
+    assert t.info == {"n": 3}
+    # started, running, informed and finished
+    assert len(written) == 4
+    assert [x.count("state: running") for x in written] == [0, 1, 1, 0]
+
+
+def test_snapshot_resume(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=False)
+    t = sireo.run("steps", Steps, n=3)
+    magic = data.COMPRESSIONS[data.default_compression()]
+    with t.attach("snapshot.pickle") as f:
+        assert f.read(len(magic)) == magic
+
+    tracker = core.Tracker(t.path, meta={"m": 1}, tid="steps")
+    runner._run_tracker(tracker, Steps, dict(n=3))
+    t.reload()
+    assert t.data.state == "done"
+    assert "resumed" in t.data.at
+    assert t.result == 3
+    assert t.info == {"n": 3}
+    assert t.data.meta == {}
+
+
+def test_snapshot_min_interval(tmp_path, monkeypatch):
+    dumped = []
+    dump_snapshot = core.Tracker.dump_snapshot
+    monkeypatch.setattr(
+        core.Tracker,
+        "dump_snapshot",
+        lambda self: dumped.append(1) or dump_snapshot(self),
+    )
+    sireo.init(
+        path=str(tmp_path),
+        catalog=False,
+        snapshot_options=dict(min_interval=3600, compression=None),
+    )
+    t = sireo.run("steps", Steps, n=3)
+    assert t.result == 3
+    assert len(dumped) == 1
+    with t.attach("snapshot.pickle") as f:
+        assert f.read(1) == b"\x80"
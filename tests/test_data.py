@@ -0,0 +1,131 @@
+"""Tests for `sireo.data` module."""
+
+import datetime
+import io
+import os
+
+import pytest
+import yaml
+
+import sireo
+from sireo import data
+from sireo.data import BadPythonYAML, FancyDict
+
+DOC = FancyDict(
+    tid="a/b",
+    at=FancyDict(created=datetime.datetime(2020, 1, 2, 3, 4, 5)),
+    params=FancyDict(x=1, lst=[1, {"y": 2}, [3]], s="multi\nline\n"),
+    info={},
+    ref=BadPythonYAML("tag:yaml.org,2002:python/name:nowhere.fn", ""),
+)
+
+
+@pytest.mark.parametrize(
+    "loader", [data.YAMLLoader, data.CYAMLLoader], ids=["python", "c"]
+)
+def test_yaml_roundtrip(loader):
+    f = io.StringIO()
+    data.dump_yaml_file(f, DOC)
+    d = yaml.load(f.getvalue(), Loader=loader)
+    assert d == DOC
+    assert isinstance(d.params, FancyDict)
+    assert d.params.lst[1] == {"y": 2}
+    assert d.ref == DOC.ref
+
+
+@pytest.mark.skipif(not yaml.__with_libyaml__, reason="libyaml is not available")
+def test_c_dumper_layout():
+    f = io.StringIO()
+    data.dump_yaml_file(f, DOC)
+    expected = yaml.dump(DOC, Dumper=data.YAMLDumper)
+    assert f.getvalue() == expected.replace("nowhere.fn ''", "nowhere.fn")
+
+
+@pytest.mark.parametrize("format", data.RECORD_FORMATS)
+def test_record_roundtrip(format):
+    if format == "msgpack":
+        pytest.importorskip("msgpack")
+    doc = FancyDict(DOC, result=(1, datetime.date(2020, 1, 1)), obj=len, keys={1: 2})
+    f = io.BytesIO()
+    data.dump_record_file(f, doc, format)
+    f.seek(0)
+    d = data.load_record_file(f, format)
+    assert d == doc
+    assert isinstance(d.params, FancyDict)
+    assert d.at.created == DOC.at.created
+
+
+def test_trial_record(tmp_path):
+    sireo.init(path=str(tmp_path), record_format="json", catalog=False)
+    t = sireo.run("t", dict, a=(1, 2))
+    assert sorted(os.listdir(t.path)) == ["sireo.json", "sireo.yaml"]
+    assert t.attached == []
+    assert t.result == {"a": (1, 2)}
+    assert t.data.at.created.year >= 2020
+
+    with t.attach("sireo.yaml", "rt") as f:
+        assert data.load_yaml_file(f) == t.data
+    df = sireo.load_report(source="tree")
+    assert df["result.a"].tolist() == [(1, 2)]
+
+
+@pytest.mark.parametrize("root", ["local", "memory://atomic"])
+def test_open_atomic(tmp_path, root):
+    root = str(tmp_path) if root == "local" else root
+    fs = data.path_fs(root)
+    fn = f"{root}/f.txt"
+    with data.open_atomic(fs, fn, "wt") as f:
+        f.write("old")
+
+    with pytest.raises(RuntimeError):
+        with data.open_atomic(fs, fn, "wt") as f:
+            f.write("partial")
+            raise RuntimeError()
+    assert fs.cat_file(fn) == b"old"
+
+    with data.open_atomic(fs, fn, "wt") as f:
+        f.write("new")
+    assert fs.cat_file(fn) == b"new"
+    if root == str(tmp_path):
+        assert os.listdir(root) == ["f.txt"]
+
+
+def test_attach_is_atomic(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=False)
+    t = sireo.run("t", dict, a=1)
+    tracker = sireo.core.InfusedTracker(t.path, t.tid, None)
+    with pytest.raises(RuntimeError):
+        with tracker.attach("out.txt") as f:
+            f.write("partial")
+            assert t.attached == []
+            raise RuntimeError()
+    assert sorted(os.listdir(t.path)) == ["sireo.yaml"]
+
+
+def test_path_fs_cache():
+    fs = data.path_fs("/tmp/a")
+    assert data.path_fs("/tmp/b/c") is fs
+    assert data.path_fs("file:///tmp/a") is fs
+    assert data.path_fs("memory://a") is not fs
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_path_fs_cache_after_fork():
+    data.path_fs("/tmp/a")
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if not data._fs_cache else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+@pytest.mark.parametrize("compression", [None, *data.COMPRESSIONS])
+def test_compressed_roundtrip(compression):
+    if compression is not None and compression != "gzip":
+        pytest.importorskip({"zstd": "zstandard", "lz4": "lz4"}[compression])
+    f = io.BytesIO()
+    with data.compressed_writer(f, compression) as w:
+        w.write(b"x" * 1000)
+    assert not f.closed
+    f.seek(0)
+    assert data.decompressed_reader(f).read() == b"x" * 1000
@@ -0,0 +1,84 @@
+"""Tests for `sireo.hook` module."""
+
+import os
+import time
+
+import sireo
+from sireo import hook
+
+
+class SlowHook(hook.Hook):
+    def __init__(self, delay):
+        self.delay = delay
+        self.events = []
+
+    def _record(self, event, tracker):
+        time.sleep(self.delay)
+        self.events.append((event, tracker.data.state, dict(tracker.info)))
+
+    def on_tracker_start(self, tracker):
+        self._record("start", tracker)
+
+    def on_tracker_flush(self, tracker):
+        self._record("flush", tracker)
+
+    def on_tracker_finish(self, tracker):
+        self._record("finish", tracker)
+
+
+def informs(n):
+    for i in range(n):
+        sireo.inform(i=i)
+        sireo.current_tracker().flush()
+    return n
+
+
+def test_async_hook(tmp_path):
+    slow = SlowHook(0.05)
+    h = hook.AsyncHook(slow)
+    sireo.init(path=str(tmp_path), hooks=[h], catalog=False)
+    start = time.monotonic()
+    t = sireo.run("t", informs, n=3)
+    assert time.monotonic() - start < 0.2
+    assert t.result == 3
+    h.flush()
+    assert slow.events[0] == ("start", "started", {})
+    # started, running, then informed
+    flushed = [e[2].get("i") for e in slow.events if e[0] == "flush"]
+    assert flushed[:5] == [None, None, 0, 1, 2]
+    assert ("finish", "done", {"i": 2}) in slow.events
+    assert h.latency()["on_tracker_finish"]["count"] == 1
+    h.close()
+
+
+def test_async_hook_drop(tmp_path):
+    slow = SlowHook(0.05)
+    h = hook.AsyncHook(slow, queue_size=1, policy="drop")
+    sireo.init(path=str(tmp_path), hooks=[h], catalog=False)
+    sireo.run("t", informs, n=10)
+    h.close()
+    assert h.dropped > 0
+    assert ("finish", "done", {"i": 9}) in slow.events
+
+
+class MarkingHook(hook.Hook):
+    def on_tracker_finish(self, tracker):
+        time.sleep(0.2)
+        with open(os.path.join(tracker.path, "finished-by-hook"), "w") as f:
+            f.write(tracker.data.state)
+
+
+def test_async_hook_process_runner(tmp_path):
+    sireo.init(
+        path=str(tmp_path),
+        hooks=[hook.AsyncHook(MarkingHook())],
+        runner="process",
+        max_workers=1,
+        catalog=False,
+    )
+    t = sireo.run("t", informs, n=1)
+    assert t.result == 1
+    sireo._global_runner.close()
+    # pending event is delivered before the worker process exits
+    with open(os.path.join(t.path, "finished-by-hook")) as f:
+        assert f.read() == "done"
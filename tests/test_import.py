@@ -0,0 +1,43 @@
+"""Tests of `import sireo` cost."""
+
+import os
+import subprocess
+import sys
+
+# seconds, minimum of a few runs, override with `SIREO_IMPORT_BUDGET`
+IMPORT_BUDGET = float(os.environ.get("SIREO_IMPORT_BUDGET", 0.4))
+
+LAZY = ("pandas", "numpy", "pyarrow", "dill")
+
+
+def _run(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+
+
+def test_import_time():
+    code = (
+        "import time; t = time.perf_counter(); import sireo; "
+        "print(time.perf_counter() - t)"
+    )
+    took = min(float(_run(code)) for _ in range(3))
+    assert took < IMPORT_BUDGET
+
+
+def test_lazy_imports(tmp_path):
+    code = f"""
+import sys
+import sireo
+
+sireo.init(path={str(tmp_path)!r})
+
+@sireo.track(name="noop")
+def noop(x):
+    sireo.inform(x=x)
+    return x
+
+noop(1)
+print(",".join(m for m in {LAZY!r} if m in sys.modules))
+"""
+    assert _run(code).strip() == ""
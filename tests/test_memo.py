@@ -0,0 +1,67 @@
+"""Tests for `sireo.memo` module."""
+
+import numpy as np
+
+import sireo
+from sireo import memo
+
+calls = []
+
+
+def add(a, b):
+    calls.append((a, b))
+    if a < 0:
+        raise ValueError(a)
+    return a + b
+
+
+def test_trial_key():
+    k = memo.trial_key(add, {"a": 1, "b": {"x": 1, "y": [1, 2]}})
+    assert k == memo.trial_key(add, {"b": {"y": [1, 2], "x": 1}, "a": 1})
+    assert k == memo.trial_key(add, {"a": 1, "b": {"x": 1, "y": [1, 2]}, "_c": 3})
+    assert k != memo.trial_key(add, {"a": 2, "b": {"x": 1, "y": [1, 2]}})
+    assert k != memo.trial_key(test_trial_key, {"a": 1, "b": {"x": 1, "y": [1, 2]}})
+
+
+def test_memoize(tmp_path):
+    calls.clear()
+    sireo.init(path=str(tmp_path), memoize=True)
+
+    t1 = sireo.run("add/1", add, a=1, b=2)
+    t2 = sireo.run("add/2", add, a=1, b=2)
+    assert t1.result == t2.result == 3
+    assert t1.uid == t2.uid
+    assert t2.path == t1.path
+    assert calls == [(1, 2)]
+
+    assert sireo.run("add/3", add, a=2, b=2).result == 4
+    assert calls == [(1, 2), (2, 2)]
+
+    # failed trials are recomputed
+    sireo.run("add/4", add, a=-1, b=2)
+    sireo.run("add/5", add, a=-1, b=2)
+    assert calls[-2:] == [(-1, 2), (-1, 2)]
+
+
+class Opts:
+    def __init__(self, x):
+        self.x = x
+
+
+def test_trial_key_objects():
+    a = np.arange(10000)
+    b = a.copy()
+    b[5000] = -1
+    assert memo.trial_key(add, {"a": a}) == memo.trial_key(add, {"a": a.copy()})
+    # repr of large arrays is truncated
+    assert memo.trial_key(add, {"a": a}) != memo.trial_key(add, {"a": b})
+    assert memo.trial_key(add, {"a": a[::2]}) == memo.trial_key(
+        add, {"a": a[::2].copy()}
+    )
+
+    # default repr contains address of the object
+    assert memo.trial_key(add, {"a": Opts(1)}) == memo.trial_key(add, {"a": Opts(1)})
+    assert memo.trial_key(add, {"a": Opts(1)}) != memo.trial_key(add, {"a": Opts(2)})
+
+    # unpicklable params are not memoized
+    assert memo.trial_key(add, {"a": lambda: 1}) is None
@@ -0,0 +1,74 @@
+"""Tests for `sireo.meta` module."""
+
+import threading
+import time
+
+from sireo import meta
+
+
+def test_capture_meta_concurrent():
+    def slow():
+        time.sleep(0.3)
+        return "slow"
+
+    def none():
+        raise meta.NoMetadataException()
+
+    start = time.monotonic()
+    m = meta.capture_meta({"a.x": slow, "a.y": slow, "b": none})
+    assert time.monotonic() - start < 0.55
+    assert m == {"a": {"x": "slow", "y": "slow"}}
+
+
+def test_capture_meta_timeout():
+    @meta.provider(timeout=0.1)
+    def hangs():
+        time.sleep(5)
+
+    start = time.monotonic()
+    assert meta.capture_meta({"h": hangs, "v": lambda: 1}) == {"v": 1}
+    assert time.monotonic() - start < 1
+
+
+def test_capture_meta_stable():
+    calls = []
+
+    @meta.provider(stable=True)
+    def host():
+        calls.append(1)
+        return "box"
+
+    for _ in range(3):
+        assert meta.capture_meta({"host": host}) == {"host": "box"}
+    assert len(calls) == 1
+
+    @meta.provider(stable=True)
+    def broken():
+        calls.append(1)
+        raise RuntimeError()
+
+    meta.capture_meta({"b": broken})
+    meta.capture_meta({"b": broken})
+    assert len(calls) == 3
+
+
+def test_capture_meta_hung_provider_is_not_resubmitted():
+    release = threading.Event()
+    calls = []
+
+    @meta.provider(timeout=0.05)
+    def hangs():
+        calls.append(1)
+        release.wait()
+        return "late"
+
+    threads = threading.active_count()
+    for _ in range(5):
+        assert meta.capture_meta({"h": hangs}) == {}
+    assert len(calls) == 1
+    assert threading.active_count() <= threads + 1
+
+    release.set()
+    time.sleep(0.05)
+    assert meta.capture_meta({"h": hangs}) == {"h": "late"}
+    assert len(calls) == 2
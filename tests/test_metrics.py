@@ -0,0 +1,264 @@
+"""Tests for `sireo.metrics` module."""
+
+import datetime
+import json
+import os
+import pickle
+import time
+from array import array
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sireo
+from sireo import core
+from sireo.metrics import _MISSING, ColumnBuffer, read_metrics_file
+
+
+def test_column_buffer():
+    b = ColumnBuffer()
+    b.append({"i": 1, "f": 0.5, "s": "a"}, 1.0)
+    b.append({"i": 2.5, "f": 1, "x": True, "at": -1}, 2.0)
+    b.append({"i": 3, "f": None, "s": "c"}, 3.0)
+
+    assert len(b) == 3
+    assert b.columns["at"] == array("d", [1, 2, 3])
+    assert b.columns["i"] == array("d", [1, 2.5, 3])
+    assert b.columns["f"] == [0.5, 1.0, None]
+    assert b.columns["s"] == ["a", _MISSING, "c"]
+    assert b.columns["x"] == [_MISSING, True, _MISSING]
+    assert list(b.rows())[1] == {"at": 2.0, "i": 2.5, "f": 1.0, "x": True}
+
+    assert pickle.loads(pickle.dumps(b)).columns["s"][1] is _MISSING
+
+    df = b.to_dataframe()
+    assert list(df.columns) == ["at", "i", "f", "s", "x"]
+    assert df["i"].dtype == "float64"
+
+    b.clear()
+    assert len(b) == 0 and list(b.columns) == ["at"]
+
+
+def test_column_buffer_bool():
+    b = ColumnBuffer()
+    for v in (1, True, 0.5, False):
+        b.append({"f": v}, 0.0)
+    assert b.columns["f"] == [1, True, 0.5, False]
+    assert [type(v) for v in b.columns["f"]] == [int, bool, float, bool]
+    b.append({"d": 0.5}, 0.0)
+    b.append({"d": True}, 0.0)
+    assert b.columns["d"][-2:] == [0.5, True] and b.columns["d"][-1] is True
+
+
+def meter_loop(n, format):
+    for i in range(n):
+        sireo.meter(step=i, loss=1 / (i + 1), format=format)
+        sireo.meter({"step": i, "acc": 0.5}, series="eval", format=format)
+
+
+def test_meter_files(tmp_path):
+    sireo.init(path=str(tmp_path))
+    t = sireo.run("csv", meter_loop, n=5, format="csv")
+    with t.attach("metrics-0000.csv", "rt") as f:
+        df = pd.read_csv(f, index_col="at")
+    assert list(df.columns) == ["step", "loss"]
+    assert df["step"].tolist() == list(range(5))
+    assert df["loss"].iloc[1] == 0.5
+
+    t = sireo.run("jsonl", meter_loop, n=5, format="jsonl")
+    with t.attach("metrics-0001-eval.jsonl", "rt") as f:
+        rows = [json.loads(x) for x in f]
+    assert [r["step"] for r in rows] == list(range(5))
+    assert set(rows[0]) == {"at", "step", "acc"}
+
+
+def meter_batch(n):
+    sireo.meter(step=-1, loss=1.0)
+    sireo.meter_many({"step": np.arange(n), "loss": np.linspace(0, 1, n)})
+    sireo.meter_many(
+        pd.DataFrame({"step": np.arange(3), "name": list("abc")}), series="df"
+    )
+
+
+def test_meter_many(tmp_path):
+    tracker = core.Tracker(path=f"{tmp_path}/many", meta={}, tid="many")
+    tracker.metrics.metrics_per_file = 4
+    with sireo.using_tracker(tracker):
+        tracker.run(meter_batch, n=10)
+    t = core.Trial(tracker.path)
+    chunks = sorted(x for x in t.attached if x.startswith("metrics"))
+    assert chunks == [
+        "metrics-0000.csv",
+        "metrics-0001.csv",
+        "metrics-0002.csv",
+        "metrics-0003-df.csv",
+    ]
+    df = pd.concat(pd.read_csv(f"{t.path}/{c}") for c in chunks if "df" not in c)
+    assert df["step"].tolist() == list(range(-1, 10))
+
+
+def test_meter_many_lengths():
+    b = ColumnBuffer()
+    b.extend({"i": np.arange(2)}, np.zeros(2))
+    b.extend({"i": np.array([0.5]), "s": np.array(["x"])}, np.ones(1))
+    assert b.columns["i"] == array("d", [0, 1, 0.5])
+    assert b.columns["s"] == [_MISSING, _MISSING, "x"]
+    assert len(b) == 3
+
+
+def test_meter_many_uint64():
+    b = ColumnBuffer()
+    b.extend({"u": np.array([1], "uint64")}, np.zeros(1))
+    assert b.columns["u"] == array("q", [1])
+    b.extend({"u": np.array([2 ** 64 - 1], "uint64")}, np.ones(1))
+    assert b.columns["u"] == [1, 2 ** 64 - 1]
+    b = ColumnBuffer()
+    b.extend({"u": np.array([2 ** 64 - 1], "uint64")}, np.zeros(1))
+    assert b.columns["u"] == [2 ** 64 - 1]
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_binary_formats(tmp_path, format):
+    pytest.importorskip("pyarrow")
+    sireo.init(path=str(tmp_path))
+    t = sireo.run(format, meter_loop, n=5, format=format)
+    with t.attach(f"metrics-0000.{format}") as f:
+        df = read_metrics_file(f, format)
+    assert list(df.columns) == ["at", "step", "loss"]
+    assert df["step"].dtype == "int64"
+    assert df["step"].tolist() == list(range(5))
+
+    with t.attach(f"metrics-0001-eval.{format}") as f:
+        df = read_metrics_file(f, format, columns=["acc"])
+    assert list(df.columns) == ["acc"]
+    assert df["acc"].dtype == "float64"
+
+
+def meter_late_column(format):
+    sireo.meter({"x": 0}, format=format)
+    sireo.current_tracker().metrics.flush()
+    sireo.meter({"x": 1, "y": 1.5}, format=format)
+
+
+@pytest.mark.parametrize("format", ["csv", "jsonl", "parquet", "arrow"])
+def test_load_metrics_missing_columns(tmp_path, format):
+    if format in ("parquet", "arrow"):
+        pytest.importorskip("pyarrow")
+    sireo.init(path=str(tmp_path))
+    t = sireo.run(format, meter_late_column, format=format)
+    df = t.load_metrics(columns=["y", "x"])
+    assert list(df.columns) == ["at", "y", "x"]
+    assert df["x"].tolist() == [0, 1]
+    assert df["y"].isna().tolist() == [True, False]
+    assert df["y"].iloc[1] == 1.5
+
+
+def meter_at(n):
+    sireo.meter_many({"at": np.arange(n, dtype=float), "v": np.arange(n)})
+    sireo.meter_many({"at": np.arange(n, dtype=float), "w": np.ones(n)}, "s")
+    infused = sireo.current_tracker().infused_tracker()
+    infused.meter_many({"at": np.arange(n, dtype=float) + 0.5, "v": -np.arange(n)})
+    infused.flush()
+
+
+def test_load_metrics(tmp_path):
+    tracker = core.Tracker(path=f"{tmp_path}/load", meta={}, tid="load")
+    tracker.metrics.metrics_per_file = 3
+    with sireo.using_tracker(tracker):
+        tracker.run(meter_at, n=7)
+    t = core.Trial(tracker.path)
+
+    df = t.load_metrics(uid="")
+    assert df["v"].tolist() == list(range(7))
+
+    df = t.load_metrics()
+    assert df["v"].tolist() == list(range(7)) + [-x for x in range(7)]
+
+    df = t.load_metrics(series="s", columns=["w"], start=2, end=5)
+    assert list(df.columns) == ["at", "w"]
+    assert df["at"].tolist() == [2, 3, 4]
+
+    df = t.load_metrics(series=None, uid="", end=1)
+    assert sorted(df["series"]) == ["", "s"]
+
+    chunks = list(t.load_metrics(iterator=True, uid=""))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+
+
+@pytest.fixture
+def new_york_tz(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def meter_now(n):
+    for i in range(n):
+        sireo.meter(i=i)
+    now = datetime.datetime.now()
+    sireo.meter_many({"at": np.array([now], "datetime64[us]"), "j": [0]}, "dt")
+    return now.timestamp()
+
+
+def test_load_metrics_local_time(tmp_path, new_york_tz):
+    tracker = core.Tracker(path=f"{tmp_path}/tz", meta={}, tid="tz")
+    start = datetime.datetime.now() - datetime.timedelta(minutes=1)
+    with sireo.using_tracker(tracker):
+        tracker.run(meter_now, n=5)
+    end = datetime.datetime.now() + datetime.timedelta(minutes=1)
+    t = core.Trial(tracker.path)
+
+    # naive datetimes are local, like `at` of metered rows
+    assert len(t.load_metrics(start=start, end=end)) == 5
+    assert len(t.load_metrics(end=np.datetime64(end))) == 5
+    assert len(t.load_metrics(end=start)) == 0
+    assert t.load_metrics(series="dt")["at"].tolist() == [
+        pytest.approx(t.result, abs=1e-5)
+    ]
+
+
+def meter_slowly(n):
+    tracker = sireo.current_tracker()
+    for i in range(n):
+        sireo.meter(step=i)
+    deadline = time.monotonic() + 10
+    while not any(x.startswith("metrics") for x in os.listdir(tracker.path)):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    sireo.meter(step=n)
+    return tracker.metrics._writer is not None
+
+
+def test_background_flush(tmp_path):
+    sireo.init(
+        path=str(tmp_path),
+        metrics_options={"background": True, "max_age": 0.05, "queue_size": 1},
+    )
+    t = sireo.run("bg", meter_slowly, n=3)
+    assert t.result is True
+    df = t.load_metrics()
+    assert df["step"].tolist() == [0, 1, 2, 3]
+    assert len([x for x in t.attached if x.startswith("metrics")]) == 2
+    assert not sireo.metrics._background_exporters
+
+
+def test_flush_max_bytes(tmp_path):
+    tracker = core.Tracker(
+        path=f"{tmp_path}/bytes",
+        meta={},
+        tid="bytes",
+        metrics_options={"max_bytes": 100, "background": True},
+    )
+    for i in range(20):
+        tracker.meter({"a": i, "b": 1.0})
+    tracker.metrics.flush()
+    state = pickle.loads(pickle.dumps(tracker.metrics)).__dict__
+    assert state["_writer"] is None
+    tracker.metrics.close()
+    chunks = list(sireo.metrics.iter_metrics(core.Trial(tracker.path)))
+    assert [len(c) for c in chunks] == [5] * 4
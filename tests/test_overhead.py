@@ -0,0 +1,44 @@
+"""Tests for `sireo.overhead` module."""
+
+import pytest
+
+import sireo
+from sireo import core, hook, overhead
+
+
+def metered(n):
+    for i in range(n):
+        sireo.meter(dict(i=i))
+    return n
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(overhead, "_enabled", True)
+    overhead.reset()
+
+
+def test_overhead(tmp_path, enabled):
+    sireo.init(path=str(tmp_path), catalog=False, meta_providers={"x": lambda: 1})
+    t = sireo.run("m", metered, n=5)
+    o = t.info.sireo_overhead
+    assert o["metrics.meter"]["count"] == 5
+    assert o["meta.capture"]["count"] == 1
+    assert o["hook.start"]["count"] == 1
+    assert o["tracker.flush"]["seconds"] > 0
+    assert overhead.stats()["metrics.meter"]["count"] == 5
+
+
+def test_overhead_disabled(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=False)
+    t = sireo.run("m", metered, n=5)
+    assert "sireo_overhead" not in t.info
+
+
+def test_overhead_infused_hook(tmp_path, enabled):
+    tracker = core.Tracker(path=str(tmp_path), meta={}, tid="t")
+    infused = tracker.infused_tracker()
+    assert isinstance(infused.hook, hook.TimedHook)
+    assert not isinstance(infused.hook.hook, hook.TimedHook)
+    infused.flush()
+    assert overhead.stats()["hook.flush"]["count"] == 1
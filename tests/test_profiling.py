@@ -0,0 +1,94 @@
+"""Tests for `sireo.profiling` module."""
+
+import pstats
+
+import pandas as pd
+import pytest
+
+import sireo
+from sireo import core, profiling, runner
+
+
+def work(n):
+    return sum(len(str(i) * 10) for i in range(n))
+
+
+@pytest.mark.parametrize(
+    "mode, artifact",
+    [
+        ("cprofile", "profile.pstats"),
+        ("sample", "profile.folded"),
+        ("tracemalloc", "alloc-top.txt"),
+    ],
+)
+def test_runner_profile(tmp_path, mode, artifact):
+    sireo.init(path=str(tmp_path), catalog=False, profile=mode)
+    t = sireo.run("work", work, n=30000)
+    assert artifact in t.attached
+    assert t.info.profile.mode == mode
+    assert t.info.profile.total_time > 0
+    if mode == "tracemalloc":
+        assert t.info.profile.alloc_peak > 0
+    if mode == "cprofile":
+        stats = pstats.Stats(f"{t.path}/profile.pstats")
+        assert any(fn[2] == "work" for fn in stats.stats)
+
+
+def test_track_profile(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=False)
+    sireo.track(name="work", profile="cprofile")(work)(n=10)
+    sireo.track(name="plain")(work)(n=10)
+    df = sireo.load_report(source="tree")
+    modes = dict(zip(df["tid"].str.split("/").str[0], df["info.profile.mode"]))
+    assert modes["work"] == "cprofile"
+    assert pd.isna(modes["plain"])
+
+
+def test_sweep_profile_rate(tmp_path):
+    sireo.init(
+        path=str(tmp_path),
+        catalog=False,
+        profile=profiling.Profiler("cprofile", rate=0.0),
+    )
+    trials = list(sireo.sweep(work, {"n": [1, 2, 3]}, name="w"))
+    assert all("profile.pstats" not in t.attached for t in trials)
+
+
+def test_profile_true(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=False, profile=True)
+    assert sireo.run("work", work, n=10).info.profile.mode == "cprofile"
+    sireo.init(path=str(tmp_path), catalog=False)
+    sireo.track(name="tracked", profile=True)(work)(n=10)
+    df = sireo.load_report(source="tree")
+    assert df["info.profile.mode"].tolist() == ["cprofile", "cprofile"]
+
+
+def test_profile_false(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=False, profile=False)
+    t = sireo.run("work", work, n=10)
+    assert "profile" not in t.info
+
+
+class Snapshotted:
+    """Picklable iterator, so trial can be snapshotted."""
+
+    def __init__(self, n):
+        self.n = n
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        sireo.snapshot()
+        return work(self.n)
+
+
+def test_snapshot_excludes_profiler(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=False, profile="sample")
+    t = sireo.run("work", Snapshotted, n=10)
+    assert t.info.profile.mode == "sample"
+
+    tracker = core.Tracker(t.path, meta={}, tid="work")
+    runner._run_tracker(tracker, Snapshotted, dict(n=10))
+    assert "resumed" in core.Trial(t.path).data.at
+    assert tracker.profiler is None
@@ -0,0 +1,55 @@
+"""Tests for `sireo.report` module."""
+
+import shutil
+
+import sireo
+from sireo import core, report
+
+
+def inc(x):
+    sireo.inform(nested={"x": x})
+    return x + 1
+
+
+def test_incremental_report(tmp_path, monkeypatch):
+    sireo.init(
+        path=str(tmp_path), meta_providers={"host.name": lambda: "box"}, catalog=False
+    )
+    for x in range(20):
+        sireo.run(f"inc/{x:02}", inc, x=x)
+
+    loads = []
+    load_row = report._load_row
+    monkeypatch.setattr(
+        report, "_load_row", lambda *args: loads.append(args[1]) or load_row(*args)
+    )
+
+    builder = report.ReportBuilder(tmp_path)
+    df = builder.build()
+    assert len(loads) == 20
+    assert df["tid"].tolist() == [f"inc/{x:02}" for x in range(20)]
+    assert df["info.nested.x"].tolist() == list(range(20))
+    assert set(df["meta.host.name"]) == {"box"}
+    assert df["result"].tolist() == list(range(1, 21))
+
+    loads.clear()
+    assert builder.build().equals(df)
+    assert loads == []
+
+    t = core.Trial(f"{tmp_path}/inc/03")
+    with t.attach("sireo.yaml", "rt") as f:
+        text = f.read().replace("state: done", "state: checked")
+    with t.attach("sireo.yaml", "wt") as f:
+        f.write(text)
+    shutil.rmtree(f"{tmp_path}/inc/04")
+    df = builder.build()
+    assert len(loads) == 1 and loads[0].endswith("inc/03/sireo.yaml")
+    assert len(df) == 19 and df["state"].tolist().count("checked") == 1
+
+
+def test_load_report_from_tree(tmp_path):
+    sireo.init(path=str(tmp_path), catalog=False)
+    sireo.run("inc", inc, x=1)
+    df = sireo.load_report(source="tree")
+    assert df["params.x"].tolist() == [1]
+    assert df["result"].tolist() == [2]
@@ -0,0 +1,63 @@
+"""Tests for `sireo.resources` module."""
+
+import os
+import time
+
+import pytest
+
+import sireo
+from sireo import metrics, resources
+
+
+def busy(seconds):
+    end = time.process_time() + seconds
+    x = 0
+    while time.process_time() < end:
+        x += 1
+    return x > 0
+
+
+def test_sample():
+    s = resources.sample()
+    assert s["cpu"] > 0
+    if os.path.exists("/proc/self/statm"):
+        assert s["rss"] > 0
+
+
+@pytest.mark.parametrize("runner", ["inplace", "process"])
+def test_resource_sampler(tmp_path, runner):
+    sireo.init(
+        path=str(tmp_path),
+        hooks=[resources.ResourceSampler(interval=0.02)],
+        runner=runner,
+        catalog=False,
+    )
+    t = sireo.run("busy", busy, seconds=0.2)
+    assert t.result is True
+    df = t.load_metrics(series="resources")
+    assert len(df) >= 2
+    assert (df["cpu"].diff().dropna() >= 0).all()
+    info = t.info.resources
+    assert info.cpu_total >= 0.1
+    assert info.cpu_percent_peak > 0
+    if os.path.exists("/proc/self/statm"):
+        assert info.rss_peak == df["rss"].max()
+
+
+def check_written(seconds):
+    time.sleep(seconds)
+    # samples are on disk while the trial is running
+    tracker = sireo.current_tracker()
+    return [
+        c.series for c in metrics.find_metrics_chunks(sireo.core.Trial(tracker.path))
+    ]
+
+
+def test_resource_sampler_writes_while_running(tmp_path):
+    sireo.init(
+        path=str(tmp_path),
+        hooks=[resources.ResourceSampler(interval=0.01, flush_interval=0.05)],
+        catalog=False,
+    )
+    t = sireo.run("sleep", check_written, seconds=0.3)
+    assert "resources" in t.result
@@ -0,0 +1,133 @@
+"""Tests for `sireo.runner` module."""
+
+import asyncio
+import os
+import threading
+
+import pytest
+
+import sireo
+from sireo import core, runner
+
+
+def square(x):
+    return x * x
+
+
+def fail(x):
+    raise ValueError(x)
+
+
+@sireo.track("pid", rand_slug=False, tid_pattern="{x}")
+def tracked_pid(x):
+    return os.getpid()
+
+
+@pytest.fixture
+def process_runner(tmp_path):
+    sireo.init(path=str(tmp_path), runner="process", max_workers=2)
+    yield sireo._global_runner
+    sireo._global_runner.close()
+
+
+def test_find_runner():
+    assert runner.find_runner("inplace") is runner.InplaceRunner
+    assert runner.find_runner("process") is runner.ProcessRunner
+    with pytest.raises(ValueError):
+        runner.find_runner("unknown")
+
+
+def test_process_runner(process_runner):
+    trials = [sireo.run(f"square/{i}", square, x=i) for i in range(6)]
+    assert all(isinstance(t, core.FutureTrial) for t in trials)
+    assert [t.result for t in trials] == [i * i for i in range(6)]
+    assert all(t.done() and t.status == "done" for t in trials)
+    assert trials[3].params == {"x": 3}
+
+
+def test_process_runner_fail(process_runner):
+    trial = sireo.run("fail", fail, x=1)
+    assert trial.wait().status == "fail"
+    with pytest.raises(core.TrialFailedException):
+        trial.result
+
+
+def test_process_runner_track(process_runner):
+    assert tracked_pid(1) != os.getpid()
+
+
+def inform_thread(x, _barrier):
+    _barrier.wait()
+    sireo.inform(x=x, thread=threading.get_ident())
+    return x
+
+
+def test_thread_runner(tmp_path):
+    sireo.init(path=str(tmp_path), runner="threads", max_workers=4)
+    barrier = threading.Barrier(4, timeout=10)
+    trials = [
+        sireo.run(f"t/{i}", inform_thread, x=i, _barrier=barrier) for i in range(4)
+    ]
+    sireo._global_runner.close()
+    assert [t.result for t in trials] == list(range(4))
+    assert [t.info.x for t in trials] == list(range(4))
+    assert len({t.info.thread for t in trials}) == 4
+
+
+async def async_square(x):
+    await asyncio.sleep(0.01)
+    sireo.inform(x=x)
+    return x * x
+
+
+async def async_gen(n):
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield None
+    yield n
+
+
+@sireo.track("asq", rand_slug=False, tid_pattern="{x}")
+async def tracked_async_square(x):
+    return await async_square(x)
+
+
+def test_async_runner(tmp_path):
+    sireo.init(path=str(tmp_path), runner="async")
+    assert sireo.run("sq", async_square, x=3).result == 9
+    assert sireo.run("gen", async_gen, n=3).result == 3
+
+    async def main():
+        return await asyncio.gather(*(tracked_async_square(x) for x in range(5)))
+
+    assert asyncio.run(main()) == [x * x for x in range(5)]
+    assert core.Trial(f"{tmp_path}/asq/4").info.x == 4
+
+
+def test_expand_grid():
+    grid = list(sireo._expand_grid({"a": [1, 2], "b": "xy", "c": range(2)}))
+    assert len(grid) == 4
+    assert grid[0] == {"a": 1, "b": "xy", "c": 0}
+    assert list(sireo._expand_grid([{"a": 1}, {"a": 2}])) == [{"a": 1}, {"a": 2}]
+
+
+def test_sweep(tmp_path):
+    captured = []
+    sireo.init(
+        path=str(tmp_path),
+        runner="threads",
+        meta_providers={"n": lambda: captured.append(1) or len(captured)},
+    )
+    trials = list(sireo.sweep(square, {"x": range(10)}, max_concurrency=3))
+    sireo._global_runner.close()
+    assert sorted(t.result for t in trials) == [x * x for x in range(10)]
+    assert captured == [1]
+    assert {t.meta.n for t in trials} == {1}
+
+
+def test_sweep_inplace_streams(tmp_path):
+    sireo.init(path=str(tmp_path))
+    trials = sireo.sweep(square, [{"x": 2}, {"x": 3}], name="sq")
+    t = next(trials)
+    assert t.result == 4 and t.tid.startswith("sq/")
+    assert [t.result for t in trials] == [9]
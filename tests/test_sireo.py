@@ -6,7 +6,7 @@ import pytest
 
 from click.testing import CliRunner
 
-from sireo import sireo
+import sireo
 from sireo import cli
 
 
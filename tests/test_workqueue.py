@@ -0,0 +1,79 @@
+"""Tests for `sireo.workqueue` module."""
+
+import multiprocessing
+import os
+
+import pytest
+
+import sireo
+from sireo import core, workqueue
+
+
+def pid(x):
+    return x, os.getpid()
+
+
+def test_queue_workers(tmp_path):
+    sireo.init(path=str(tmp_path), runner="queue", poll_interval=0.05)
+    trials = [sireo.run(f"pid/{i}", pid, x=i) for i in range(8)]
+    assert all(isinstance(t, core.FutureTrial) for t in trials)
+    assert not any(t.done() for t in trials)
+
+    workers = [
+        multiprocessing.Process(
+            target=workqueue.work,
+            args=(str(tmp_path),),
+            kwargs=dict(max_idle=0.5, poll_interval=0.01),
+        )
+        for _ in range(3)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=30)
+        assert w.exitcode == 0
+
+    results = [t.wait(timeout=10).result for t in trials]
+    assert [x for x, _ in results] == list(range(8))
+    assert {p for _, p in results} <= {w.pid for w in workers}
+    sireo._global_runner.close()
+
+    queue = workqueue.WorkQueue(tmp_path)
+    assert queue.pending() == queue.running() == queue.finished() == []
+
+
+def test_reclaim_expired_lease(tmp_path):
+    sireo.init(path=str(tmp_path), runner="queue", poll_interval=0.05)
+    trial = sireo.run("pid", pid, x=1)
+
+    # simulate worker which died right after claiming the trial
+    queue = workqueue.WorkQueue(tmp_path)
+    (uid,) = queue.pending()
+    assert queue.claim(uid, "dead", timeout=-1)
+    assert queue.pending() == [] and queue.running() == [(uid, "dead")]
+
+    assert workqueue.work(tmp_path, max_idle=0, poll_interval=0.01) == 1
+    assert trial.wait(timeout=10).result == (1, os.getpid())
+    sireo._global_runner.close()
+
+
+class FailingHook(sireo.hook.Hook):
+    def on_tracker_start(self, tracker):
+        raise RuntimeError("hook failed")
+
+
+def test_task_failing_outside_trial(tmp_path):
+    sireo.init(
+        path=str(tmp_path), runner="queue", poll_interval=0.05, hooks=FailingHook()
+    )
+    trials = [sireo.run(f"pid/{i}", pid, x=i) for i in range(2)]
+
+    # worker survives the failure and processes the next task
+    assert workqueue.work(tmp_path, max_idle=0, poll_interval=0.01) == 2
+    for t in trials:
+        with pytest.raises(core.TrialFailedException, match="hook failed"):
+            t.wait(timeout=10)
+    sireo._global_runner.close()
+
+    queue = workqueue.WorkQueue(tmp_path)
+    assert queue.pending() == queue.running() == queue.finished() == []